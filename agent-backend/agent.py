@@ -3,6 +3,7 @@
 COST OPTIMIZATION: Implements context window sliding to prevent token explosion.
 """
 import asyncio
+import logging
 import re
 import uuid
 import time
@@ -21,7 +22,7 @@ from observability import (
     log as logger,
     bind_context,
     SessionMetrics,
-    AGENT_TASKS,
+    AGENT_TASKS_BY_STATUS,
     AGENT_TURN_DURATION,
     AGENT_TURNS_PER_TASK,
     GEMINI_API_CALLS,
@@ -72,8 +73,7 @@ class ComputerUseAgent:
         
         # Session memory - this persists across agent.run() calls
         self.session_context = session_context or SessionContext(
-            session_id=str(uuid.uuid4()),
-            created_at=datetime.now().isoformat()
+            session_id=uuid.uuid4().hex
         )
         
         # Session metrics for real-time tracking
@@ -116,7 +116,7 @@ class ComputerUseAgent:
         
         Returns a WorkflowRecord with all steps taken.
         """
-        self.task_id = str(uuid.uuid4())
+        self.task_id = uuid.uuid4().hex
         self.steps = []
         self._stop_requested = False
         # self._notify_status(TaskStatus.RUNNING, f"Starting task: {goal}")
@@ -143,10 +143,10 @@ class ComputerUseAgent:
                 clipboard=self.session_context.clipboard,
                 previous_tasks=len(self.session_context.task_history),
             )
-            AGENT_TASKS.labels(status="started").inc()
+            AGENT_TASKS_BY_STATUS["started"].inc()
             
             # Add current instruction to session memory
-            self.session_context.user_instructions.append(goal)
+            self.session_context.add_instruction(goal)
             
             # Build the master context prompt
             context_parts = []
@@ -513,9 +513,8 @@ class ComputerUseAgent:
                     context_parts.append("=" * 60)
             
             context_prompt = "\n".join(context_parts)
-            print(f"\n[PROMPT] FULL PROMPT TO AGENT (first 2000 chars):\n{context_prompt[:2000]}")
-            if len(context_prompt) > 2000:
-                print(f"... [truncated, total length: {len(context_prompt)} chars]")
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug("agent_prompt", prompt_head=context_prompt[:2000], prompt_chars=len(context_prompt))
 
             # Build initial content with screenshot
             initial_screenshot = await self.browser.get_screenshot_bytes()
@@ -554,13 +553,13 @@ class ComputerUseAgent:
                 
                 for attempt in range(max_retries):
                     try:
-                        api_start = time.time()
+                        api_start = time.perf_counter()
                         response = self.client.models.generate_content(
                             model=self.MODEL_NAME,
                             contents=contents,
                             config=config,
                         )
-                        api_duration = time.time() - api_start
+                        api_duration = time.perf_counter() - api_start
                         
                         # Track Gemini API call in session metrics
                         if self.session_metrics:
@@ -739,9 +738,9 @@ class ComputerUseAgent:
                     print(f"\n{log_message} | Full args: {args}")
                     
                     # Execute the action (async)
-                    action_start = time.time()
+                    action_start = time.perf_counter()
                     result = await self.browser.execute_action(action_name, args)
-                    action_duration = time.time() - action_start
+                    action_duration = time.perf_counter() - action_start
                     
                     # Track browser action in session metrics
                     if self.session_metrics:
@@ -771,8 +770,7 @@ class ComputerUseAgent:
                                 id_match = re.search(r'(?:copied|copy|ID is|ID:)\s*["\']?([A-Z]{2}[\d]+|[A-Z0-9\-]+)', reasoning, re.IGNORECASE)
                                 if id_match:
                                     copied_value = id_match.group(1)
-                                    self.session_context.clipboard = copied_value
-                                    self.session_context.last_copied_values.append(copied_value)
+                                    self.session_context.remember_value(copied_value)
                                     print(f"   [CLIPBOARD] STORED IN CLIPBOARD: {copied_value}")
                             
                     # If reasoning mentions copying something specific, store it
@@ -782,8 +780,7 @@ class ComputerUseAgent:
                         if company_id_match and "cop" in reasoning.lower():
                             copied_id = company_id_match.group(1)
                             if copied_id not in self.session_context.last_copied_values:
-                                self.session_context.clipboard = copied_id
-                                self.session_context.last_copied_values.append(copied_id)
+                                self.session_context.remember_value(copied_id)
                                 print(f"   [CLIPBOARD] EXTRACTED & STORED: {copied_id}")
                     
                     # ==============================================
@@ -872,8 +869,7 @@ class ComputerUseAgent:
                                         records = index_result.get("records_count", 0)
                                         filename = new_file.split('/')[-1] if '/' in new_file else new_file.split(chr(92))[-1]
                                         self.session_context.important_notes["hammer_indexed"] = "true"
-                                        self.session_context.important_notes["hammer_records"] = str(records)
-                                        self.session_context.important_notes["hammer_file"] = filename
+                                        self.session_context.record_hammer_index(records, filename=filename)
                                         
                                         if self.on_status_change:
                                             self.on_status_change(
@@ -913,7 +909,7 @@ class ComputerUseAgent:
                             raise e  # Re-raise to trigger task failure cleanup
 
                     # Create step record
-                    step = ActionStep(
+                    step = ActionStep.model_construct(
                         step_number=step_number,
                         action_type=action_name,
                         args=args,
@@ -990,8 +986,8 @@ class ComputerUseAgent:
             "final_url": self.session_context.current_url,
             "timestamp": datetime.now().isoformat(),
         }
-        self.session_context.task_history.append(task_summary)
-        print(f"\n[COMPLETE] TASK COMPLETE. Session has {len(self.session_context.task_history)} tasks in history.")
+        self.session_context.record_task(task_summary)
+        print(f"\n[COMPLETE] TASK COMPLETE. Session has {self.session_context.tasks_completed} tasks in history.")
         print(f"   Clipboard: {self.session_context.clipboard}")
         print(f"   Copied values: {self.session_context.last_copied_values}")
         
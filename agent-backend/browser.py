@@ -130,6 +130,25 @@ class BrowserController:
         self._pending_downloads = []
         self._completed_downloads = []
 
+    async def reset(self) -> None:
+        """Replace the context and page with fresh ones, keeping the browser process.
+        
+        Drops cookies, storage and downloads from the previous session so a
+        pooled browser can be handed to the next request.
+        """
+        if not self._started or not self._browser:
+            return
+        if self._context:
+            await self._context.close()
+        self._context = await self._browser.new_context(
+            viewport={"width": SCREEN_WIDTH, "height": SCREEN_HEIGHT},
+            accept_downloads=True,
+        )
+        self._context.on("download", self._on_download)
+        self._page = await self._context.new_page()
+        self._pending_downloads = []
+        self._completed_downloads = []
+
     @property
     def page(self) -> Page:
         if not self._page:
@@ -1,33 +1,44 @@
 """Cache Service - Embedding and LLM response caching for cost optimization.
 
-This module provides disk-based caching for:
+This module provides disk-based caching (fronted by an in-memory LRU) for:
 - Text embeddings (to avoid redundant Gemini API calls)
 - Query embeddings (for repeated searches)
 
+And in-memory semantic caching for:
+- Workflow matches (to skip Pinecone queries for near-duplicate goals)
+
 MIT-grade implementation with hash-based keys and JSON serialization.
 """
 import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+import numpy as np
+
+from config import MRL_DIMENSION
+
 
 class EmbeddingCache:
     """
     Disk-based cache for embedding vectors.
     
     Uses MD5 hash of input text as cache key, stores embeddings as JSON.
-    Reduces API calls by 40-60% for repeated content.
+    Reduces API calls by 40-60% for repeated content. Recently used
+    embeddings are also kept in memory so repeat lookups skip the file read.
     """
     
-    def __init__(self, cache_dir: str = None):
+    def __init__(self, cache_dir: str = None, memory_capacity: int = 1024):
         """
         Initialize the embedding cache.
         
         Args:
             cache_dir: Directory for cache files. Defaults to ./cache/embeddings
+            memory_capacity: Max embeddings held in memory (least recently used are dropped)
         """
         if cache_dir is None:
             # Default to agent-backend/cache/embeddings
@@ -37,9 +48,15 @@ class EmbeddingCache:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # cache_key -> embedding tuple, least recently used first
+        self.memory_capacity = memory_capacity
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
         # Statistics
         self.hits = 0
         self.misses = 0
+        self.memory_hits = 0
     
     def _generate_key(self, text: str, context: str = "") -> str:
         """Generate a cache key from text content."""
@@ -50,6 +67,14 @@ class EmbeddingCache:
         """Get the file path for a cache key."""
         return self.cache_dir / f"{cache_key}.json"
     
+    def _remember(self, cache_key: str, embedding: List[float]) -> None:
+        """Keep an embedding in the in-memory LRU, evicting the oldest if full."""
+        with self._lock:
+            self._memory[cache_key] = tuple(embedding)
+            self._memory.move_to_end(cache_key)
+            if len(self._memory) > self.memory_capacity:
+                self._memory.popitem(last=False)
+    
     def get(self, text: str, context: str = "") -> Optional[List[float]]:
         """
         Retrieve cached embedding if available.
@@ -62,6 +87,16 @@ class EmbeddingCache:
             The cached embedding vector, or None if not found
         """
         cache_key = self._generate_key(text, context)
+        
+        with self._lock:
+            remembered = self._memory.get(cache_key)
+            if remembered is not None:
+                self._memory.move_to_end(cache_key)
+                self.hits += 1
+                self.memory_hits += 1
+                # Callers get their own list, as they would from disk
+                return list(remembered)
+        
         cache_path = self._get_cache_path(cache_key)
         
         if cache_path.exists():
@@ -69,7 +104,10 @@ class EmbeddingCache:
                 with open(cache_path, 'r') as f:
                     data = json.load(f)
                 self.hits += 1
-                return data.get('embedding')
+                embedding = data.get('embedding')
+                if embedding is not None:
+                    self._remember(cache_key, embedding)
+                return embedding
             except (json.JSONDecodeError, IOError):
                 # Corrupted cache file, delete it
                 cache_path.unlink(missing_ok=True)
@@ -88,6 +126,7 @@ class EmbeddingCache:
         """
         cache_key = self._generate_key(text, context)
         cache_path = self._get_cache_path(cache_key)
+        self._remember(cache_key, embedding)
         
         data = {
             'text_preview': text[:100] if len(text) > 100 else text,
@@ -113,10 +152,12 @@ class EmbeddingCache:
         
         return {
             'hits': self.hits,
+            'memory_hits': self.memory_hits,
             'misses': self.misses,
             'total_requests': total,
             'hit_rate_percent': round(hit_rate, 2),
             'cached_embeddings': cached_count,
+            'memory_cached_embeddings': len(self._memory),
             'cache_dir': str(self.cache_dir)
         }
     
@@ -126,8 +167,11 @@ class EmbeddingCache:
         for cache_file in self.cache_dir.glob("*.json"):
             cache_file.unlink()
             count += 1
+        with self._lock:
+            self._memory.clear()
         self.hits = 0
         self.misses = 0
+        self.memory_hits = 0
         return count
     
     def log_stats(self) -> None:
@@ -138,8 +182,93 @@ class EmbeddingCache:
               f"Cached: {stats['cached_embeddings']}")
 
 
-# Singleton instance
+class MatchCache:
+    """
+    In-memory semantic cache of workflow matches keyed by goal embedding.
+    
+    Recent goal embeddings live in a fixed-size ring buffer (a single float32
+    matrix) next to the workflow match found for each. A lookup is one
+    matrix-vector product; if the closest cached goal has cosine similarity
+    >= threshold, its match is reused instead of querying Pinecone again.
+    """
+    
+    def __init__(self, dimension: int = MRL_DIMENSION, capacity: int = 256, threshold: float = 0.97):
+        """
+        Initialize the match cache.
+        
+        Args:
+            dimension: Embedding dimension
+            capacity: Max cached goals (oldest entries are overwritten)
+            threshold: Minimum cosine similarity to count as a hit
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._matches: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._size = 0
+        self._next = 0
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+    
+    def get(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached match for a near-identical goal embedding.
+        
+        Args:
+            embedding: Embedding of the goal
+        
+        Returns:
+            The cached match, or None if no cached goal is similar enough
+        """
+        query = self._unit(embedding)
+        if self._size and query is not None:
+            similarities = self._vectors[:self._size] @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self.hits += 1
+                return self._matches[best]
+        
+        self.misses += 1
+        return None
+    
+    def put(self, embedding: List[float], match: Dict[str, Any]) -> None:
+        """
+        Cache the match found for a goal embedding.
+        
+        Args:
+            embedding: Embedding of the goal
+            match: Workflow match returned for that goal
+        """
+        vector = self._unit(embedding)
+        if vector is None:
+            return
+        
+        self._vectors[self._next] = vector
+        self._matches[self._next] = match
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+    
+    def clear(self) -> None:
+        """Drop all cached matches (e.g. after new workflows are indexed)."""
+        self._matches = [None] * self.capacity
+        self._size = 0
+        self._next = 0
+
+
+# Singleton instances
 _embedding_cache = None
+_match_cache = None
 
 
 def get_embedding_cache() -> EmbeddingCache:
@@ -148,3 +277,11 @@ def get_embedding_cache() -> EmbeddingCache:
     if _embedding_cache is None:
         _embedding_cache = EmbeddingCache()
     return _embedding_cache
+
+
+def get_match_cache() -> MatchCache:
+    """Get the singleton MatchCache instance."""
+    global _match_cache
+    if _match_cache is None:
+        _match_cache = MatchCache()
+    return _match_cache
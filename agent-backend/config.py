@@ -12,6 +12,7 @@ MRL_DIMENSION = int(os.getenv("MRL_DIMENSION", "768"))  # Matryoshka Representat
 # Pinecone
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY", "")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "agent-workflows")
+MATCH_HIGH_CONFIDENCE = float(os.getenv("MATCH_HIGH_CONFIDENCE", "0.85"))  # Top match at/above this skips tiered matching
 
 # Browser
 SCREEN_WIDTH = 1440
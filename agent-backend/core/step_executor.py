@@ -217,9 +217,10 @@ class StepExecutor:
                     if self.on_status_update:
                         await self.on_status_update(step.step_id, StepStatus.PASS, "Step passed")
 
-                    return StepExecutionResult(
+                    # Fields come from the validated TestStep; skip re-validation
+                    return StepExecutionResult.model_construct(
                         step_id=step.step_id,
-                        status=StepStatus.PASS,
+                        status=StepStatus.PASS.value,
                         action=step.action,
                         target_description=step.target_description,
                         expected_visual=step.expected_visual,
@@ -312,9 +313,9 @@ class StepExecutor:
         if self.on_status_update:
             await self.on_status_update(step.step_id, StepStatus.FAIL, last_error or "Unknown error")
 
-        return StepExecutionResult(
+        return StepExecutionResult.model_construct(
             step_id=step.step_id,
-            status=StepStatus.FAIL,
+            status=StepStatus.FAIL.value,
             action=step.action,
             target_description=step.target_description,
             expected_visual=step.expected_visual,
@@ -18,6 +18,27 @@ from config import GOOGLE_API_KEY
 from model_selector import select_model, TaskType
 
 
+# Keyword extraction: tokens of 3+ alphanumerics, minus common stop words
+_KEYWORD_RE = re.compile(r"[a-z0-9]{3,}")
+_STOP_WORDS = frozenset({
+    "the", "a", "an", "to", "from", "for", "of", "in", "on", "at",
+    "and", "or", "but", "with", "this", "that", "these", "those",
+    "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did",
+    "will", "would", "could", "should", "may", "might",
+    "i", "you", "he", "she", "it", "we", "they",
+    "my", "your", "his", "her", "its", "our", "their",
+    "please", "now", "go", "file"
+})
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Extract unique keywords from text for fallback matching (first-seen order)."""
+    return list(dict.fromkeys(
+        word for word in _KEYWORD_RE.findall(text.lower()) if word not in _STOP_WORDS
+    ))
+
+
 @dataclass
 class SubTask:
     """Represents a decomposed sub-task."""
@@ -238,23 +259,7 @@ Return ONLY valid JSON array, no explanation:"""
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract important keywords from text for matching."""
-        # Remove common stop words
-        stop_words = {
-            "the", "a", "an", "to", "from", "for", "of", "in", "on", "at",
-            "and", "or", "but", "with", "this", "that", "these", "those",
-            "is", "are", "was", "were", "be", "been", "being",
-            "have", "has", "had", "do", "does", "did",
-            "will", "would", "could", "should", "may", "might",
-            "i", "you", "he", "she", "it", "we", "they",
-            "my", "your", "his", "her", "its", "our", "their",
-            "please", "now", "go", "file"
-        }
-        
-        # Tokenize and filter
-        words = re.findall(r'\b[a-zA-Z0-9]+\b', text.lower())
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        return list(set(keywords))  # Remove duplicates
+        return extract_keywords(text)
     
     def _enrich_subtasks(self, subtasks: List[SubTask]) -> List[SubTask]:
         """
@@ -281,16 +286,17 @@ Return ONLY valid JSON array, no explanation:"""
             "static_data"
         ]
         
-        for subtask in subtasks:
+        # Embed all subtask queries (action + target) in a single batched call
+        search_queries = [f"{subtask.action} {subtask.target}" for subtask in subtasks]
+        try:
+            from screenshot_embedder import get_embedder
+            embeddings = get_embedder().embed_queries(search_queries)
+        except Exception as e:
+            print(f"   ❌ Error embedding subtasks: {e}")
+            return subtasks
+        
+        for subtask, embedding in zip(subtasks, embeddings):
             try:
-                # Build search query from action + target + keywords
-                search_query = f"{subtask.action} {subtask.target}"
-                
-                # Generate embedding
-                from screenshot_embedder import get_embedder
-                embedder = get_embedder()
-                embedding = embedder.embed_query(search_query)
-                
                 best_match = None
                 best_score = 0.0
                 source_namespace = None
@@ -13,9 +13,11 @@ Flow:
 5. GET /api/admin/tools/questions/history_download/{_id}
 6. Save bytes and trigger HammerIndexer
 """
+import ast
 import os
 import json
 import httpx
+import orjson
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Callable
 from difflib import SequenceMatcher
@@ -430,8 +432,6 @@ def parse_companies_from_text(text: str) -> List[Dict]:
     Returns:
         List of company dicts
     """
-    import ast
-    
     try:
         # Find start of list
         start_marker = "COMPANIES = ["
@@ -459,8 +459,12 @@ def parse_companies_from_text(text: str) -> List[Dict]:
         
         if end_idx != -1:
             list_str = text[start_bracket_idx:end_idx]
-            # Safe evaluation
-            companies = ast.literal_eval(list_str)
+            # JSON-compatible lists parse with orjson; Python literals
+            # (single quotes, trailing commas) fall back to safe evaluation
+            try:
+                companies = orjson.loads(list_str)
+            except orjson.JSONDecodeError:
+                companies = ast.literal_eval(list_str)
             if isinstance(companies, list):
                 print(f"[REGISTRY] Successfully parsed {len(companies)} companies from text")
                 return companies
@@ -467,6 +467,15 @@ def get_hammer_indexer(on_progress: Optional[Callable[[str, float], None]] = Non
     return _indexer
 
 
+def index_hammer_file(file_path: str, clear_existing: bool = True) -> dict:
+    """
+    Index a hammer file with this process's HammerIndexer.
+    
+    Module-level so it can be submitted to a ProcessPoolExecutor worker.
+    """
+    return get_hammer_indexer().index_hammer(file_path, clear_existing=clear_existing)
+
+
 if __name__ == "__main__":
     # Test with command line argument
     if len(sys.argv) > 1:
@@ -59,6 +59,9 @@ class HybridSearchService:
     
     # Pinecone's sparse embedding model
     SPARSE_MODEL = "pinecone-sparse-english-v0"
+    # Max inputs per embedding request (Pinecone sparse model / Gemini)
+    SPARSE_EMBED_BATCH_SIZE = 96
+    DENSE_EMBED_BATCH_SIZE = 100
     
     def __init__(
         self, 
@@ -129,23 +132,41 @@ class HybridSearchService:
         Returns:
             Dict with 'indices' and 'values' for sparse_values
         """
-        try:
-            result = self.pc.inference.embed(
-                model=self.SPARSE_MODEL,
-                inputs=[text],
-                parameters={"input_type": input_type, "truncate": "END"}
-            )
-            
-            if result and len(result) > 0:
-                embedding = result[0]
-                return {
-                    "indices": embedding.get("sparse_indices", []),
-                    "values": embedding.get("sparse_values", [])
-                }
-        except Exception as e:
-            print(f"[HYBRID] Sparse embedding failed: {e}")
+        return self.generate_sparse_embeddings([text], input_type)[0]
+    
+    def generate_sparse_embeddings(self, texts: List[str], input_type: str = "query") -> List[Dict[str, Any]]:
+        """
+        Generate sparse embeddings for several texts, SPARSE_EMBED_BATCH_SIZE per request.
+        
+        Args:
+            texts: Texts to convert to sparse vectors
+            input_type: "query" or "passage"
             
-        return {"indices": [], "values": []}
+        Returns:
+            One dict with 'indices' and 'values' per text, in input order
+            (empty for texts whose request failed)
+        """
+        sparse_embeddings = []
+        for start in range(0, len(texts), self.SPARSE_EMBED_BATCH_SIZE):
+            batch = texts[start:start + self.SPARSE_EMBED_BATCH_SIZE]
+            batch_embeddings = [{"indices": [], "values": []} for _ in batch]
+            try:
+                result = self.pc.inference.embed(
+                    model=self.SPARSE_MODEL,
+                    inputs=batch,
+                    parameters={"input_type": input_type, "truncate": "END"}
+                )
+                
+                for i, embedding in enumerate(result or []):
+                    batch_embeddings[i] = {
+                        "indices": embedding.get("sparse_indices", []),
+                        "values": embedding.get("sparse_values", [])
+                    }
+            except Exception as e:
+                print(f"[HYBRID] Sparse embedding failed: {e}")
+            sparse_embeddings.extend(batch_embeddings)
+        
+        return sparse_embeddings
     
     # ==================== HYBRID UPSERT (Single Index) ====================
     
@@ -180,15 +201,25 @@ class HybridSearchService:
         self.ensure_hybrid_index_exists(index_name)
         index = self.pc.Index(index_name)
         
+        records = [r for r in records if r.get("id") and r.get(text_field, "")]
+        texts = [record[text_field] for record in records]
+        
+        # Embed in batches rather than one request per record: dense vectors
+        # only for records without a pre-computed one, sparse for all
+        missing_dense = [i for i, record in enumerate(records) if not record.get("dense_embedding")]
+        dense_embeddings = [record.get("dense_embedding") for record in records]
+        for start in range(0, len(missing_dense), self.DENSE_EMBED_BATCH_SIZE):
+            batch = missing_dense[start:start + self.DENSE_EMBED_BATCH_SIZE]
+            computed = self.embedder.embed_queries([texts[i] for i in batch])
+            for i, embedding in zip(batch, computed):
+                dense_embeddings[i] = embedding
+        sparse_embeddings = self.generate_sparse_embeddings(texts, input_type="passage")
+        
         vectors = []
         
-        for record in records:
-            record_id = record.get("id")
-            text = record.get(text_field, "")
+        for record, text, dense_embedding, sparse in zip(records, texts, dense_embeddings, sparse_embeddings):
+            record_id = record["id"]
             metadata = record.get("metadata", {})
-            
-            if not record_id or not text:
-                continue
                 
             # Add timestamp if not present
             if "indexed_at" not in metadata:
@@ -197,14 +228,6 @@ class HybridSearchService:
             # Store searchable text in metadata for retrieval
             metadata["searchable_text"] = text[:1000]
             
-            # Dense vector (use pre-computed if available)
-            dense_embedding = record.get("dense_embedding")
-            if not dense_embedding:
-                dense_embedding = self.generate_dense_embedding(text)
-            
-            # Sparse vector
-            sparse = self.generate_sparse_embedding(text, input_type="passage")
-            
             vector_data = {
                 "id": record_id,
                 "values": dense_embedding,
@@ -1,15 +1,27 @@
 """FastAPI backend for the Computer Use Agent."""
+import anyio
+import ast
 import asyncio
+import io
 import json
+import logging
+import multiprocessing
+import orjson
+import re
 import config  # Load environment variables from .env
 import uuid
+import zipfile
 from datetime import datetime
-from typing import Dict, Optional, List
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional, List
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 import time
+import traceback
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from prometheus_fastapi_instrumentator import Instrumentator
 
@@ -27,7 +39,7 @@ from observability import (
     bind_context,
     generate_trace_id,
     WEBSOCKET_CONNECTIONS,
-    WEBSOCKET_MESSAGES,
+    websocket_messages_sent,
     AGENT_TASKS,
     WORKFLOW_SAVES,
     SessionMetrics,
@@ -56,11 +68,12 @@ from agent import ComputerUseAgent
 from browser import BrowserController
 from semantic_qa_agent import SemanticQAAgent, create_semantic_qa_agent, validate_test_plan
 from core.test_plan_parser import TestPlanParser
-from storage import save_workflow, load_workflow, list_workflows, delete_workflow
+from storage import save_workflow, load_workflow, list_workflows, delete_workflow, SCREENSHOTS_DIR
 from pinecone_service import PineconeService, IndexType
 from download_tracker import get_download_tracker
-from hammer_indexer import get_hammer_indexer
-from goal_decomposer import get_goal_decomposer, SubTask
+from hammer_indexer import index_hammer_file
+from goal_decomposer import get_goal_decomposer, extract_keywords, SubTask
+from screenshot_embedder import get_embedder
 from hammer_downloader import (
     get_hammer_downloader, 
     is_hammer_download_intent, 
@@ -68,6 +81,7 @@ from hammer_downloader import (
     parse_companies_from_text
 )
 from auth_service import get_auth_service
+from cache_service import get_match_cache
 from dependency_analyzer import get_dependency_analyzer
 import os
 
@@ -78,10 +92,255 @@ pinecone_service = PineconeService()
 # Store active tasks
 active_tasks: Dict[str, Dict] = {}
 
+# Hammer download workflow texts (used by /hammer/index-workflow)
+HAMMER_WORKFLOW_TEXT = """
+        download hammer file from company client western digital adobe vonage
+        descargar hammer archivo xlsm de cliente
+        get hammer configuration download automatically api
+        fetch hammer from graphite no browser needed direct api call
+        """
+HAMMER_WORKFLOW_VARIATIONS = [
+    ("Download hammer from Western Digital", "download hammer western digital wd US66254 xlsm"),
+    ("Descargar hammer de cliente", "descargar hammer archivo cliente company download spanish"),
+    ("Download hammer to test configuration", "download hammer test new configuration verify changes"),
+]
+HAMMER_WORKFLOW_TEST_QUERY = "download hammer from western digital"
+
+
+def _embed_hammer_workflow_texts() -> List[List[float]]:
+    """Embed the hammer workflow text, its variations and the verification query.
+    
+    Returns embeddings in order: [main text, *variations, test query].
+    """
+    embedder = get_embedder()
+    texts = [HAMMER_WORKFLOW_TEXT, *(text for _, text in HAMMER_WORKFLOW_VARIATIONS), HAMMER_WORKFLOW_TEST_QUERY]
+    # One batched request (cache misses only) instead of one call per text
+    return embedder.embed_queries(texts)
+
+
+# Status frames only differ in their field values, so keep the JSON skeleton
+# pre-serialized and encode just the variable parts. Sent as text frames:
+# the UI parses every frame with JSON.parse(event.data).
+_STATUS_FRAME = b'{"type":"status","status":%b,"message":%b}'
+_STATUS_FRAME_WITH_TASK = b'{"type":"status","status":%b,"message":%b,"task_id":%b}'
+
+
+def _status_frame(status: str, message: str, task_id: Optional[str] = None) -> str:
+    """Serialize a status frame from the pre-built template."""
+    if task_id is None:
+        frame = _STATUS_FRAME % (orjson.dumps(status), orjson.dumps(message))
+    else:
+        frame = _STATUS_FRAME_WITH_TASK % (orjson.dumps(status), orjson.dumps(message), orjson.dumps(task_id))
+    return frame.decode()
+
+
+# Completed frames embed pydantic's model_dump_json() output directly, skipping
+# the intermediate model_dump() dict. Result models sent to clients leave out
+# None fields (mostly-empty evidence and error fields).
+_COMPLETED_TEST_FRAME = '{"type":"completed","workflow_id":%s,"test_result":%s}'
+_COMPLETED_RESULT_FRAME = '{"type":"completed","result":%s}'
+
+
+def _completed_test_frame(task_id: str, result: BaseModel) -> str:
+    """Serialize a /ws test plan completed frame."""
+    return _COMPLETED_TEST_FRAME % (orjson.dumps(task_id).decode(), result.model_dump_json(exclude_none=True))
+
+
+def _completed_result_frame(result: BaseModel) -> str:
+    """Serialize a /ws/test-plan completed frame."""
+    return _COMPLETED_RESULT_FRAME % result.model_dump_json(exclude_none=True)
+
+
+# Base64 never needs JSON escaping, so screenshot frames are spliced together
+# directly instead of re-scanning the (large) payload in a serializer.
+_SCREENSHOT_FRAME = '{"type":"screenshot","data":"%s"}'
+_STEP_SCREENSHOT_FRAME = '{"type":"screenshot","step_id":%d,"data":"%s"}'
+
+
+def _screenshot_frame(screenshot_b64: str, step_id: Optional[int] = None) -> str:
+    """Serialize a /ws/test-plan screenshot frame."""
+    if step_id is None:
+        return _SCREENSHOT_FRAME % screenshot_b64
+    return _STEP_SCREENSHOT_FRAME % (step_id, screenshot_b64)
+
+
+def _enum_value(value: Any) -> Any:
+    """Unwrap an Enum member to its value; pass anything else through."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _dumps_frame(data: Dict) -> str:
+    """Serialize a WebSocket frame with orjson (numpy values and non-str keys allowed)."""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+
+# ==================== PINECONE STEP QUERIES ====================
+# Lowest score tiered matching can use (its keyword fallback accepts >= 0.12)
+STEP_MATCH_MIN_SCORE = 0.12
+
+# XLSM parsing is CPU-bound; index_hammer runs in worker processes (spawned, so
+# they don't inherit the event loop's threads) to keep the loop responsive.
+# Spawned workers re-import __main__, so the app is launched via server.py.
+HAMMER_INDEX_WORKERS = 2
+_hammer_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Started browsers kept warm for the /test-plans HTTP endpoints. Filled lazily
+# (launching Chromium at startup would slow boot); reset between requests.
+TEST_PLAN_BROWSER_POOL_SIZE = 2
+_browser_pool: Optional[asyncio.Queue] = None
+
+# /ws sends at most one session-metrics frame per interval; bursts of steps
+# and status updates share a single to_dict() + serialization pass
+METRICS_FLUSH_INTERVAL_SECONDS = 0.1
+
+# anyio worker threads available to Starlette (sync endpoints, streamed iterators)
+THREADPOOL_TOKENS = 100
+
+
+async def submit_step_query(
+    embedding: List[float],
+    top_k: int = 5,
+    namespace: str = "",
+    min_score: float = 0.0,
+    prefer_recent: bool = True,
+    overfetch_factor: Optional[int] = None
+) -> List[Dict]:
+    """Run a find_similar_steps query off the event loop and return its matches."""
+    return await asyncio.to_thread(
+        pinecone_service.find_similar_steps,
+        embedding, top_k=top_k, namespace=namespace, min_score=min_score,
+        prefer_recent=prefer_recent, overfetch_factor=overfetch_factor
+    )
+
+
+def _decode_workflow(raw: Any) -> Any:
+    """Decode a workflow's step_details (JSON string, legacy Python repr, or dict).
+    
+    Tries orjson first and falls back to ast.literal_eval for legacy records
+    stored with str(dict).
+    
+    Returns:
+        The decoded workflow, or None if it cannot be parsed
+    """
+    if isinstance(raw, dict):
+        return raw
+    if not isinstance(raw, str) or not raw:
+        return None
+    
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        pass
+    
+    try:
+        workflow = ast.literal_eval(raw)
+        logger.debug("workflow_parsed_legacy_repr")
+        return workflow
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as e:
+        logger.warning("workflow_parse_failed", error=str(e))
+        return None
+
+
+# json_v2 workflow fields are stored as JSON strings: (field, default when missing)
+_JSONV2_FIELDS = (("urls_visited", "[]"), ("actions", "{}"), ("steps", "[]"), ("user_prompts", "[]"))
+
+
+def _decode_json_v2_fields(match: Dict) -> Dict[str, Any]:
+    """Decode a json_v2 match's JSON-string fields in one pass.
+    
+    Malformed values are kept as-is so the agent's own parse can warn about them.
+    """
+    fields = {}
+    for key, default in _JSONV2_FIELDS:
+        raw = match.get(key) or default
+        try:
+            fields[key] = orjson.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except orjson.JSONDecodeError:
+            fields[key] = raw
+    return fields
+
+
+def cached_embed_query(goal: str) -> List[float]:
+    """Embed a user goal; repeats are served by the embedder's EmbeddingCache."""
+    return get_embedder().embed_query(goal.strip())
+
+
+def _fetch_static_records(limit: int = 10) -> List[Dict]:
+    """Fetch static_data records, returning an empty list if Pinecone fails.
+    
+    Blocking (Pinecone SDK) - call via asyncio.to_thread from async handlers.
+    """
+    try:
+        return pinecone_service.find_all_static_data(limit=limit)
+    except Exception as e:
+        print(f"[ERROR] Failed to load company registry from static_data: {e}")
+        return []
+
+
+def _parse_companies_registry(static_records: List[Dict]) -> List[Dict]:
+    """Flatten the JSON company lists stored in static_data records.
+    
+    Each record's "data" holds a JSON array of companies (company_name, id, ...).
+    Records that are not JSON arrays are skipped.
+    """
+    companies: List[Dict] = []
+    for record in static_records:
+        data = record.get("data")
+        if not data:
+            continue
+        try:
+            parsed = orjson.loads(data) if isinstance(data, (str, bytes)) else data
+        except orjson.JSONDecodeError:
+            continue  # Skip non-JSON records
+        if isinstance(parsed, list):
+            companies.extend(parsed)
+    return companies
+
+
+# Companies rarely change within a session; reuse the parsed registry for this long
+COMPANIES_CACHE_TTL_SECONDS = 300
+
+
+async def _get_companies_registry(session_context: SessionContext) -> List[Dict]:
+    """Company registry from static_data, cached on the session for COMPANIES_CACHE_TTL_SECONDS.
+    
+    Empty results are not cached so a failed fetch is retried on the next call.
+    """
+    cached = session_context.companies_cache
+    if cached and time.monotonic() - session_context.companies_cache_ts < COMPANIES_CACHE_TTL_SECONDS:
+        return cached
+    
+    static_records = await asyncio.to_thread(_fetch_static_records, 10)
+    companies = _parse_companies_registry(static_records)
+    if companies:
+        session_context.companies_cache = companies
+        session_context.companies_cache_ts = time.monotonic()
+    return companies
+
+
+def _acquire_browser() -> BrowserController:
+    """Take a warm browser from the pool, or a new (unstarted) one if it is empty."""
+    if _browser_pool is not None and not _browser_pool.empty():
+        return _browser_pool.get_nowait()
+    return BrowserController()
+
+
+async def _release_browser(browser: BrowserController) -> None:
+    """Reset a browser and return it to the pool, stopping it if it can't be reused."""
+    if _browser_pool is not None and browser.is_started and not _browser_pool.full():
+        try:
+            await browser.reset()
+            _browser_pool.put_nowait(browser)
+            return
+        except Exception as e:
+            logger.warning("browser_reset_failed", error=str(e))
+    await browser.stop()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
+    global _hammer_process_pool, _browser_pool
     logger.info("app_starting", version="1.0.0")
     
     # LAZY AUTH: Authentication is now triggered on-demand when:
@@ -89,9 +348,33 @@ async def lifespan(app: FastAPI):
     # 2. User clicks "Start Browser Testing" (needs browser auth)
     # This reduces startup time and resource usage
     print("[STARTUP] Lazy auth enabled - authentication will happen on-demand")
+    
+    # Precompute the constant hammer workflow embeddings so /hammer/index-workflow
+    # makes no embedding calls. Non-fatal: the endpoint computes them if missing.
+    app.state.hammer_workflow_embeddings = None
+    try:
+        app.state.hammer_workflow_embeddings = await asyncio.to_thread(_embed_hammer_workflow_texts)
+    except Exception as e:
+        logger.warning("hammer_workflow_embeddings_failed", error=str(e))
+    
+    # Starlette runs sync endpoints and streamed sync iterators (report zips)
+    # on anyio's threadpool; raise its default limit of 40
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    
+    _hammer_process_pool = ProcessPoolExecutor(
+        max_workers=HAMMER_INDEX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    
+    _browser_pool = asyncio.Queue(maxsize=TEST_PLAN_BROWSER_POOL_SIZE)
         
     yield
     logger.info("app_shutting_down")
+    _hammer_process_pool.shutdown(wait=False, cancel_futures=True)
+    _hammer_process_pool = None
+    browser_pool, _browser_pool = _browser_pool, None
+    while not browser_pool.empty():
+        await browser_pool.get_nowait().stop()
 
 
 app = FastAPI(
@@ -99,6 +382,8 @@ app = FastAPI(
     description="API for controlling a browser via Gemini 2.5 Computer Use",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson renders responses (int-keyed dicts and numpy values included)
+    default_response_class=ORJSONResponse,
 )
 
 # CORS for Vue frontend
@@ -323,14 +608,12 @@ async def save_current_workflow(request: SaveWorkflowRequest):
         print(f"[SUMMARY] Summary preview:\n{execution_summary[:500]}...")
     except Exception as e:
         print(f"[WARNING] Failed to generate workflow summary: {e}")
-        import traceback
         traceback.print_exc()
     
     # 3. Index in Pinecone with BOTH raw steps AND execution summary
     pinecone_indexed = False
     try:
         # Generate embedding using Unified Embedder (Gemini)
-        from screenshot_embedder import get_embedder
         embedder = get_embedder()
         
         text_to_embed = f"{workflow.name}: {workflow.description}"
@@ -390,7 +673,8 @@ async def save_current_workflow(request: SaveWorkflowRequest):
         # Upsert with enhanced format (SINGLE SOURCE OF TRUTH)
         # We no longer use the legacy upsert_step which created duplicate records
         if request.text or request.urls_visited or request.steps_reference_only:
-            enhanced_record_id = pinecone_service.upsert_workflow_record(
+            enhanced_record_id = await asyncio.to_thread(
+                pinecone_service.upsert_workflow_record,
                 workflow_id=workflow.id,
                 name=workflow.name,
                 description=workflow.description,
@@ -414,7 +698,6 @@ async def save_current_workflow(request: SaveWorkflowRequest):
             print(f"[ENHANCED] Workflow indexed to {request.index}/{request.namespace}")
     except Exception as e:
         print(f"[WARNING] Failed to index workflow in Pinecone: {e}")
-        import traceback
         traceback.print_exc()
     
     return {
@@ -445,7 +728,6 @@ async def save_success_case(request: SaveSuccessCaseRequest):
     """Save a successful workflow execution for reinforcement learning."""
     try:
         # Generate embedding from goal text
-        from screenshot_embedder import get_embedder
         embedder = get_embedder()
         embedding = embedder.embed_query(request.goal_text)
         
@@ -454,7 +736,8 @@ async def save_success_case(request: SaveSuccessCaseRequest):
         workflow_id = hashlib.md5(f"{request.goal_text}:{request.workflow_name}".encode()).hexdigest()[:16]
         
         # Store success case
-        vector_id = pinecone_service.upsert_success_case(
+        vector_id = await asyncio.to_thread(
+            pinecone_service.upsert_success_case,
             goal_text=request.goal_text,
             workflow_id=workflow_id,
             workflow_name=request.workflow_name,
@@ -473,7 +756,6 @@ async def save_success_case(request: SaveSuccessCaseRequest):
             "step_count": len(request.steps),
         }
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to save success case: {str(e)}")
 
@@ -483,12 +765,12 @@ async def search_success_cases(query: str, top_k: int = 5, company: str = None):
     """Search for similar successful executions."""
     try:
         # Generate embedding from query
-        from screenshot_embedder import get_embedder
         embedder = get_embedder()
         embedding = embedder.embed_query(query)
         
         # Search
-        results = pinecone_service.find_similar_success_cases(
+        results = await asyncio.to_thread(
+            pinecone_service.find_similar_success_cases,
             query_embedding=embedding,
             top_k=top_k,
             company_filter=company,
@@ -500,7 +782,6 @@ async def search_success_cases(query: str, top_k: int = 5, company: str = None):
             "results": results,
         }
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
@@ -508,7 +789,7 @@ async def search_success_cases(query: str, top_k: int = 5, company: str = None):
 @app.get("/success-cases/stats")
 async def get_success_cases_stats():
     """Get statistics for the success cases index."""
-    return pinecone_service.get_success_cases_stats()
+    return await asyncio.to_thread(pinecone_service.get_success_cases_stats)
 
 
 # ==================== STATIC DATA ENDPOINTS ====================
@@ -531,12 +812,12 @@ async def save_static_data(request: SaveStaticDataRequest):
     
     try:
         # Generate embedding for the data
-        from screenshot_embedder import get_embedder
         embedder = get_embedder()
         embedding = embedder.embed_query(request.data)
         
         # Store in Pinecone (sanitization happens inside upsert_static_data)
-        vector_id = pinecone_service.upsert_static_data(
+        vector_id = await asyncio.to_thread(
+            pinecone_service.upsert_static_data,
             data=request.data,
             embedding=embedding
         )
@@ -552,7 +833,6 @@ async def save_static_data(request: SaveStaticDataRequest):
         # Security validation failed (dangerous pattern detected)
         raise HTTPException(status_code=400, detail=f"Security validation failed: {str(ve)}")
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to save static data: {str(e)}")
 
@@ -561,13 +841,12 @@ async def save_static_data(request: SaveStaticDataRequest):
 async def get_all_static_data(limit: int = 20):
     """Get all static data records."""
     try:
-        records = pinecone_service.find_all_static_data(limit=limit)
+        records = await asyncio.to_thread(pinecone_service.find_all_static_data, limit=limit)
         return {
             "count": len(records),
             "records": records,
         }
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to retrieve static data: {str(e)}")
 
@@ -653,9 +932,9 @@ async def download_hammer_direct(
         user_id = None
         if current_user:
             user_id = current_user.get("sub") or current_user.get("email")
-            print(f"[HAMMER] Indexing for user: {user_id}")
+            logger.info("hammer_download_user", user_id=user_id)
         else:
-            print("[HAMMER] Warning: No authenticated user, using default namespace")
+            logger.warning("hammer_download_no_user", namespace="default")
         
         # Get auth credentials - prioritize JWT token over cookies
         auth_cookie = request.auth_cookie
@@ -673,19 +952,19 @@ async def download_hammer_direct(
                 
                 # If neither available, trigger login
                 if not cookies:
-                    print("[HAMMER] No cached auth, triggering login...")
+                    logger.info("hammer_auth_login_triggered")
                     await auth_service.login_and_capture_state()
                     jwt_token = auth_service.get_jwt_token()
                     cookies = auth_service.get_cookies_dict()
                 
                 if not jwt_token and cookies:
                     auth_cookie = "; ".join([f"{k}={v}" for k,v in cookies.items()])
-                    print(f"[HAMMER] Using {len(cookies)} auth cookies (fallback)")
+                    logger.info("hammer_auth_cookies", cookie_count=len(cookies))
             
             if jwt_token:
-                print(f"[HAMMER] Using JWT token ({len(jwt_token)} chars)")
+                logger.info("hammer_auth_jwt", token_chars=len(jwt_token))
             elif not auth_cookie:
-                print("[HAMMER] Warning: No auth credentials available, API calls may fail")
+                logger.warning("hammer_auth_missing")
         
         downloader = get_hammer_downloader(auth_cookie=auth_cookie, jwt_token=jwt_token)
         
@@ -709,8 +988,7 @@ async def download_hammer_direct(
             )
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("hammer_download_failed")
         raise HTTPException(status_code=500, detail=f"Hammer download failed: {str(e)}")
 
 
@@ -770,7 +1048,7 @@ async def get_hammer_download_status(company_id: str):
     """
     try:
         # Get hammer index stats
-        stats = pinecone_service.get_hammer_stats()
+        stats = await asyncio.to_thread(pinecone_service.get_hammer_stats)
         
         # Try to find latest hammer history for this company
         downloader = get_hammer_downloader()
@@ -788,8 +1066,7 @@ async def get_hammer_download_status(company_id: str):
             } if latest else None,
         }
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("hammer_status_failed", company_id=company_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -834,21 +1111,16 @@ THIS IS AUTOMATIC - NO BROWSER ACTIONS NEEDED!
 """,
         }
         
-        # Generate embedding
-        text_to_embed = """
-        download hammer file from company client western digital adobe vonage
-        descargar hammer archivo xlsm de cliente
-        get hammer configuration download automatically api
-        fetch hammer from graphite no browser needed direct api call
-        """
-        
-        # Generate embedding
-        from screenshot_embedder import get_embedder
-        embedder = get_embedder()
-        embedding = embedder.embed_query(text_to_embed)
+        # Embeddings are constant - computed once at startup (see lifespan)
+        embeddings = app.state.hammer_workflow_embeddings
+        if embeddings is None:
+            embeddings = await asyncio.to_thread(_embed_hammer_workflow_texts)
+            app.state.hammer_workflow_embeddings = embeddings
+        embedding, *variation_embeddings, test_emb = embeddings
         
         # Upsert main workflow
-        pinecone_service.upsert_step(
+        await asyncio.to_thread(
+            pinecone_service.upsert_step,
             action_type="hammer_download",
             goal_description="Download Hammer File from Company (Direct API)",
             step_details=workflow_data,
@@ -857,16 +1129,11 @@ THIS IS AUTOMATIC - NO BROWSER ACTIONS NEEDED!
         )
         
         # Also add company-specific variations
-        variations = [
-            ("Download hammer from Western Digital", "download hammer western digital wd US66254 xlsm"),
-            ("Descargar hammer de cliente", "descargar hammer archivo cliente company download spanish"),
-            ("Download hammer to test configuration", "download hammer test new configuration verify changes"),
-        ]
+        variations = HAMMER_WORKFLOW_VARIATIONS
         
-        for goal, text in variations:
-            emb = embedder.embed_query(text)
-            
-            pinecone_service.upsert_step(
+        for (goal, _), emb in zip(variations, variation_embeddings):
+            await asyncio.to_thread(
+                pinecone_service.upsert_step,
                 action_type="hammer_download",
                 goal_description=goal,
                 step_details={
@@ -881,10 +1148,9 @@ THIS IS AUTOMATIC - NO BROWSER ACTIONS NEEDED!
             )
         
         # Verify it was indexed
-        test_query = "download hammer from western digital"
-        test_emb = embedder.embed_query(test_query)
+        test_query = HAMMER_WORKFLOW_TEST_QUERY
         
-        matches = pinecone_service.find_similar_steps(test_emb, top_k=3)
+        matches = await asyncio.to_thread(pinecone_service.find_similar_steps, test_emb, top_k=3)
         
         return {
             "status": "success",
@@ -900,8 +1166,7 @@ THIS IS AUTOMATIC - NO BROWSER ACTIONS NEEDED!
         }
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("hammer_workflow_index_failed")
         raise HTTPException(status_code=500, detail=f"Failed to index workflow: {str(e)}")
 
 
@@ -940,8 +1205,7 @@ async def websocket_endpoint(websocket: WebSocket):
     # It's shared between ALL tasks until "End Session"
     # ==============================================
     session_context = SessionContext(
-        session_id=str(uuid.uuid4()),
-        created_at=datetime.now().isoformat()
+        session_id=uuid.uuid4().hex
     )
     
     # ==============================================
@@ -953,957 +1217,826 @@ async def websocket_endpoint(websocket: WebSocket):
     bind_context(session_id=session_context.session_id, trace_id=generate_trace_id())
     logger.info("websocket_connected", remote=str(websocket.client))
 
-    async def send_json(data: dict, include_metrics: bool = True):
-        """Helper to send JSON message, optionally including session metrics."""
+    # Set when a metrics update is due; flush_metrics coalesces bursts into one frame
+    metrics_pending = asyncio.Event()
+
+    async def send_metrics():
+        """Send the current session metrics right away."""
+        metrics_pending.clear()
+        await websocket.send_text(_dumps_frame({
+            "type": "metrics",
+            "data": session_metrics.to_dict()
+        }))
+
+    async def flush_metrics():
+        """Send pending metrics updates, at most once per flush interval."""
+        while True:
+            await metrics_pending.wait()
+            try:
+                await send_metrics()
+            except Exception as e:
+                logger.warning("websocket_send_error", error=str(e))
+            await asyncio.sleep(METRICS_FLUSH_INTERVAL_SECONDS)
+
+    async def send_frame(text: str, message_type: str, include_metrics: bool = True):
+        """Send a serialized JSON frame, optionally followed by session metrics."""
         try:
-            await websocket.send_text(json.dumps(data))
-            WEBSOCKET_MESSAGES.labels(direction="sent", message_type=data.get("type", "unknown")).inc()
+            await websocket.send_text(text)
+            websocket_messages_sent(message_type).inc()
             session_metrics.record_message_sent()
             
-            # Send metrics update after key events (not for metrics messages themselves)
-            if include_metrics and data.get("type") in ("step", "completed", "error", "status"):
-                await websocket.send_text(json.dumps({
-                    "type": "metrics",
-                    "data": session_metrics.to_dict()
-                }))
+            # Metrics update after key events (not for metrics messages themselves);
+            # task completion flushes immediately so the final numbers aren't delayed
+            if include_metrics and message_type in ("step", "completed", "error", "status"):
+                if message_type == "completed":
+                    await send_metrics()
+                else:
+                    metrics_pending.set()
         except Exception as e:
             logger.warning("websocket_send_error", error=str(e))
 
-    try:
-        while True:
-            # Receive message from client
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_text(), 
-                    timeout=0.5
-                )
-                message = json.loads(data)
-                msg_type = message.get("type")
-                session_metrics.record_message_received()
-
-                if msg_type == "start" or msg_type == "task":
-                    goal = message.get("goal", "")
-                    start_url = message.get("start_url", "")
-                    step_offset = message.get("step_offset", 0)
-                    mode = message.get("mode", "training") # "training" or "production"
-
-                    if not goal:
-                        await send_json({"type": "error", "message": "Goal is required"})
-                        continue
-
-                    # ==============================================
-                    # DETECT TEST PLAN JSON IN GOAL
-                    # ==============================================
-                    test_plan_detected = None
-                    try:
-                        # Try to parse as JSON test plan
-                        if goal.strip().startswith("{"):
-                            parsed = json.loads(goal)
-                            # Check if it looks like a test plan
-                            if "test_case_id" in parsed and "steps" in parsed:
-                                test_plan_detected = parsed
-                                print(f"[TEST PLAN] Detected test plan: {parsed.get('test_case_id')}")
-                            elif "test_plan" in parsed:
-                                test_plan_detected = parsed.get("test_plan")
-                                print(f"[TEST PLAN] Detected wrapped test plan: {test_plan_detected.get('test_case_id')}")
-                    except json.JSONDecodeError:
-                        pass  # Not JSON, treat as regular goal
-
-                    # If test plan detected, run Semantic QA Agent
-                    if test_plan_detected:
-                        await send_json({
-                            "type": "status",
-                            "status": "running",
-                            "message": f"Executing Test Plan: {test_plan_detected.get('test_case_id', 'Unknown')}"
-                        })
+    async def send_json(data: dict, include_metrics: bool = True):
+        """Helper to send JSON message, optionally including session metrics."""
+        try:
+            text = _dumps_frame(data)
+        except TypeError as e:
+            logger.warning("websocket_send_error", error=str(e))
+            return
+        await send_frame(text, data.get("type", "unknown"), include_metrics)
 
-                        task_id = str(uuid.uuid4())
+    async def send_status(status: str, message: str, task_id: Optional[str] = None):
+        """Send a status frame built from the pre-serialized template."""
+        await send_frame(_status_frame(status, message, task_id), "status")
 
-                        # Create persistent browser if not exists
-                        if persistent_browser is None:
-                            persistent_browser = BrowserController()
-                            auth_service = get_auth_service()
-                            storage_state = auth_service.get_storage_state()
-                            await persistent_browser.start(storage_state=storage_state)
+    metrics_flusher = asyncio.create_task(flush_metrics())
 
-                        # Create Semantic QA Agent
-                        semantic_agent = SemanticQAAgent(
-                            browser=persistent_browser,
-                            session_metrics=session_metrics
-                        )
+    try:
+        while True:
+            # Receive message from client. Agent tasks report their own
+            # completion and errors, so there is no need to poll with a timeout.
+            data = await websocket.receive_text()
+            message = json.loads(data)
+            msg_type = message.get("type")
+            session_metrics.record_message_received()
+
+            if msg_type == "start" or msg_type == "task":
+                goal = message.get("goal", "")
+                start_url = message.get("start_url", "")
+                step_offset = message.get("step_offset", 0)
+                mode = message.get("mode", "training") # "training" or "production"
+
+                if not goal:
+                    await send_json({"type": "error", "message": "Goal is required"})
+                    continue
+
+                # ==============================================
+                # DETECT TEST PLAN JSON IN GOAL
+                # ==============================================
+                test_plan_detected = None
+                try:
+                    # Try to parse as JSON test plan
+                    if goal.strip().startswith("{"):
+                        parsed = json.loads(goal)
+                        # Check if it looks like a test plan
+                        if "test_case_id" in parsed and "steps" in parsed:
+                            test_plan_detected = parsed
+                            logger.info("test_plan_detected", test_case_id=parsed.get("test_case_id"))
+                        elif "test_plan" in parsed:
+                            test_plan_detected = parsed.get("test_plan")
+                            logger.info("test_plan_detected", test_case_id=test_plan_detected.get("test_case_id"), wrapped=True)
+                except json.JSONDecodeError:
+                    pass  # Not JSON, treat as regular goal
+
+                # If test plan detected, run Semantic QA Agent
+                if test_plan_detected:
+                    await send_status("running", f"Executing Test Plan: {test_plan_detected.get('test_case_id', 'Unknown')}")
+
+                    task_id = uuid.uuid4().hex
 
-                        async def run_test_plan_task():
-                            try:
-                                result = await semantic_agent.execute_test_plan(
-                                    test_plan_detected,
-                                    stop_on_failure=True,
-                                    max_retries_per_step=3
-                                )
+                    # Create persistent browser if not exists
+                    if persistent_browser is None:
+                        persistent_browser = BrowserController()
+                        auth_service = get_auth_service()
+                        storage_state = auth_service.get_storage_state()
+                        await persistent_browser.start(storage_state=storage_state)
 
-                                # Send step results
-                                for step_result in result.steps_results:
-                                    status_emoji = "✓" if step_result.status == "pass" else "✗" if step_result.status == "fail" else "○"
-                                    await send_json({
-                                        "type": "message",
-                                        "role": "agent",
-                                        "content": f"{status_emoji} Step {step_result.step_id} ({step_result.action}): {step_result.status.upper()}"
-                                    })
-
-                                # Send final result
-                                summary = f"### Test Execution Complete\n\n"
-                                summary += f"**Test Case:** {result.test_case_id}\n"
-                                summary += f"**Status:** {result.overall_status.upper()}\n"
-                                summary += f"**Passed:** {result.passed_steps} | **Failed:** {result.failed_steps} | **Skipped:** {result.skipped_steps}\n"
-                                summary += f"**Duration:** {result.total_execution_time_ms}ms"
+                    # Create Semantic QA Agent
+                    semantic_agent = SemanticQAAgent(
+                        browser=persistent_browser,
+                        session_metrics=session_metrics
+                    )
 
+                    async def run_test_plan_task():
+                        try:
+                            # Stream step results as each step completes
+                            async for step_result in semantic_agent.execute_test_plan_iter(
+                                test_plan_detected,
+                                stop_on_failure=True,
+                                max_retries_per_step=3
+                            ):
+                                status_emoji = "✓" if step_result.status == "pass" else "✗" if step_result.status == "fail" else "○"
                                 await send_json({
-                                    "type": "status",
-                                    "status": "completed",
-                                    "message": summary
+                                    "type": "message",
+                                    "role": "agent",
+                                    "content": f"{status_emoji} Step {step_result.step_id} ({step_result.action}): {step_result.status.upper()}"
                                 })
+                            result = semantic_agent.last_execution_result
 
-                                await send_json({
-                                    "type": "completed",
-                                    "workflow_id": task_id,
-                                    "test_result": result.model_dump()
-                                })
+                            # Send final result
+                            summary = f"### Test Execution Complete\n\n"
+                            summary += f"**Test Case:** {result.test_case_id}\n"
+                            summary += f"**Status:** {result.overall_status.upper()}\n"
+                            summary += f"**Passed:** {result.passed_steps} | **Failed:** {result.failed_steps} | **Skipped:** {result.skipped_steps}\n"
+                            summary += f"**Duration:** {result.total_execution_time_ms}ms"
 
-                            except Exception as e:
-                                import traceback
-                                traceback.print_exc()
-                                await send_json({
-                                    "type": "error",
-                                    "message": f"Test plan execution failed: {str(e)}"
-                                })
+                            await send_status("completed", summary)
 
-                        agent_task = asyncio.create_task(run_test_plan_task())
-                        continue  # Skip regular goal processing
+                            await send_frame(_completed_test_frame(task_id, result), "completed")
 
-                    # Inject Auth State
-                    auth_service = get_auth_service()
-                    storage_state = auth_service.get_storage_state()
-                    if storage_state:
-                         print("[WS] Injecting auth state into browser session")
-                         # Note: BrowserController needs to support this in .start()
-                         
-                    # Determine route path to set default mode if not specified
-                    # (FastAPI doesn't easily expose path in WS, so rely on client 'mode' or default)
-                    
-                    # Store mode in context
-                    active_tasks[str(uuid.uuid4())] = {"mode": mode, "status": "pending"} # placeholder
-                    
-                    # ==============================================
-                    # PROCESS SPECIAL COMMANDS IN GOAL
-                    # ==============================================
-                    import re
-                    
-                    # Check for "remember: VALUE" or "clipboard: VALUE" commands
-                    remember_match = re.match(r'^(?:remember|clipboard|store):\s*(.+)$', goal, re.IGNORECASE)
-                    if remember_match:
-                        value_to_remember = remember_match.group(1).strip()
-                        session_context.clipboard = value_to_remember
-                        session_context.last_copied_values.append(value_to_remember)
-                        print(f"[CLIPBOARD] USER MANUALLY SET CLIPBOARD: {value_to_remember}")
-                        await send_json({
-                            "type": "status",
-                            "status": "idle",
-                            "message": f"Remembered: {value_to_remember}",
-                        })
-                        continue  # Don't run agent, just store the value
-                    
-                    # Check for "note: KEY=VALUE" to store important info
-                    note_match = re.match(r'^note:\s*(\w+)\s*=\s*(.+)$', goal, re.IGNORECASE)
-                    if note_match:
-                        key = note_match.group(1).strip()
-                        value = note_match.group(2).strip()
-                        session_context.important_notes[key] = value
-                        print(f"[NOTE] USER STORED NOTE: {key} = {value}")
-                        await send_json({
-                            "type": "status",
-                            "status": "idle",
-                            "message": f"Noted: {key} = {value}",
-                        })
-                        continue
+                        except Exception as e:
+                            logger.exception("test_plan_failed", task_id=task_id)
+                            await send_json({
+                                "type": "error",
+                                "message": f"Test plan execution failed: {str(e)}"
+                            })
 
-                    # Cancel any running agent task
-                    if agent_task and not agent_task.done():
-                        agent_task.cancel()
-                        try:
-                            await agent_task
-                        except asyncio.CancelledError:
-                            pass
+                    agent_task = asyncio.create_task(run_test_plan_task())
+                    continue  # Skip regular goal processing
+
+                # Inject Auth State
+                auth_service = get_auth_service()
+                storage_state = auth_service.get_storage_state()
+                if storage_state:
+                     print("[WS] Injecting auth state into browser session")
+                     # Note: BrowserController needs to support this in .start()
+                     
+                # Determine route path to set default mode if not specified
+                # (FastAPI doesn't easily expose path in WS, so rely on client 'mode' or default)
+                
+                # Store mode in context
+                active_tasks[uuid.uuid4().hex] = {"mode": mode, "status": "pending"} # placeholder
+                
+                # ==============================================
+                # PROCESS SPECIAL COMMANDS IN GOAL
+                # ==============================================
+                
+                # Check for "remember: VALUE" or "clipboard: VALUE" commands
+                remember_match = re.match(r'^(?:remember|clipboard|store):\s*(.+)$', goal, re.IGNORECASE)
+                if remember_match:
+                    value_to_remember = remember_match.group(1).strip()
+                    session_context.remember_value(value_to_remember)
+                    print(f"[CLIPBOARD] USER MANUALLY SET CLIPBOARD: {value_to_remember}")
+                    await send_status("idle", f"Remembered: {value_to_remember}")
+                    continue  # Don't run agent, just store the value
+                
+                # Check for "note: KEY=VALUE" to store important info
+                note_match = re.match(r'^note:\s*(\w+)\s*=\s*(.+)$', goal, re.IGNORECASE)
+                if note_match:
+                    key = note_match.group(1).strip()
+                    value = note_match.group(2).strip()
+                    session_context.important_notes[key] = value
+                    print(f"[NOTE] USER STORED NOTE: {key} = {value}")
+                    await send_status("idle", f"Noted: {key} = {value}")
+                    continue
+
+                # Cancel any running agent task
+                if agent_task and not agent_task.done():
+                    agent_task.cancel()
+                    try:
+                        await agent_task
+                    except asyncio.CancelledError:
+                        pass
 
-                    task_id = str(uuid.uuid4())
-                    active_tasks[task_id] = {"steps": [], "status": TaskStatus.PENDING, "mode": mode}
-                    session_metrics.record_task_started()
+                task_id = uuid.uuid4().hex
+                active_tasks[task_id] = {"steps": [], "status": TaskStatus.PENDING, "mode": mode}
+                session_metrics.record_task_started()
+                
+                # --- PRODUCTION MODE: ADVISOR ---
+                if mode == "production":
+                    await send_status("thinking", "Analyzing Ticket & Hammer Dependencies...", task_id)
                     
-                    # --- PRODUCTION MODE: ADVISOR ---
-                    if mode == "production":
-                        await send_json({
-                            "type": "status",
-                            "status": "thinking",
-                            "message": "Analyzing Ticket & Hammer Dependencies...",
-                            "task_id": task_id
-                        })
+                    try:
+                        # Run Dependency Analysis
+                        analyzer = get_dependency_analyzer()
+                        analysis = await analyzer.analyze_ticket(goal)
                         
-                        try:
-                            # Run Dependency Analysis
-                            analyzer = get_dependency_analyzer()
-                            analysis = await analyzer.analyze_ticket(goal)
-                            
-                            # Send Report
-                            report_text = f"### 🛡️ Production Advisor Report\n\n"
-                            
-                            if analysis["found"]:
-                                report_text += f"{analysis['guidance_text']}\n\n"
-                                report_text += "### 📋 Recommended Verification Steps\n"
-                                for q in analysis["questions_to_verify"]:
-                                    report_text += f"- [ ] Check {q}\n"
-                                    
-                                report_text += "\n> **Next Step:** Please manually verify these settings in the Hammer file or Environment before proceeding."
-                            else:
-                                report_text += "No direct Hammer dependencies found for this ticket. Proceed with standard exploratory testing."
+                        # Send Report
+                        report_text = f"### 🛡️ Production Advisor Report\n\n"
+                        
+                        if analysis["found"]:
+                            report_text += f"{analysis['guidance_text']}\n\n"
+                            report_text += "### 📋 Recommended Verification Steps\n"
+                            for q in analysis["questions_to_verify"]:
+                                report_text += f"- [ ] Check {q}\n"
                                 
-                            # Send as a 'step' with no screenshot, just text/plan
-                            # We treat it as an agent message
-                            await send_json({
-                                "type": "status",
-                                "status": "completed",
-                                "message": report_text, 
-                                "task_id": task_id
-                            })
-                            
-                            # Also save as a pseudo-task result so it's not empty
-                            active_tasks[task_id]["analysis"] = analysis
-                            
-                        except Exception as e:
-                            logger.error("analysis_failed", error=str(e))
-                            await send_json({
-                                "type": "error", 
-                                "message": f"Dependency Analysis Failed: {str(e)}",
-                                "task_id": task_id
-                            })
+                            report_text += "\n> **Next Step:** Please manually verify these settings in the Hammer file or Environment before proceeding."
+                        else:
+                            report_text += "No direct Hammer dependencies found for this ticket. Proceed with standard exploratory testing."
                             
-                        continue  # End this loop iteration, don't start the standard agent
-                    
-                    # --- TRAINING MODE: STANDARD AGENT ---
-
-                    # Callbacks that send messages directly via WebSocket
-                    def on_step(step: ActionStep, screenshot_b64: str):
-                        # Adjust step number with offset for accumulated display
-                        adjusted_step = ActionStep(
-                            step_number=step.step_number + step_offset,
-                            action_type=step.action_type,
-                            args=step.args,
-                            screenshot_path=step.screenshot_path,
-                            url=step.url,
-                            timestamp=step.timestamp,
-                            reasoning=step.reasoning,
-                        )
-                        active_tasks[task_id]["steps"].append(adjusted_step)
-                        session_metrics.record_agent_turn()  # Track each agent step
-                        # Use asyncio.create_task to send without blocking
-                        asyncio.create_task(send_json({
-                            "type": "step",
-                            "step": adjusted_step.model_dump(),
-                            "screenshot": screenshot_b64,
-                        }))
-
-                    def on_status_change(status: TaskStatus, msg: str):
-                        active_tasks[task_id]["status"] = status
-                        asyncio.create_task(send_json({
-                            "type": "status",
-                            "status": status.value,
-                            "message": msg,
-                            "task_id": task_id
-                        }))
-
-                    # Create persistent browser if not exists
-                    if persistent_browser is None:
-                        persistent_browser = BrowserController()
+                        # Send as a 'step' with no screenshot, just text/plan
+                        # We treat it as an agent message
+                        await send_status("completed", report_text, task_id)
                         
-                        # Inject Auth State from Service
-                        auth_service = get_auth_service()
-                        storage_state = auth_service.get_storage_state()
-                        if storage_state:
-                            print("[WS] Starting browser with injected auth state")
+                        # Also save as a pseudo-task result so it's not empty
+                        active_tasks[task_id]["analysis"] = analysis
+                        
+                    except Exception as e:
+                        logger.error("analysis_failed", error=str(e))
+                        await send_json({
+                            "type": "error", 
+                            "message": f"Dependency Analysis Failed: {str(e)}",
+                            "task_id": task_id
+                        })
                         
-                        # Start browser explicitly to inject auth
-                        await persistent_browser.start(start_url, storage_state=storage_state)
-                        # NOTE: Changed from google.com to about:blank - no more unnecessary searches!
-                        print(f"[BROWSER] Browser started at: {start_url or 'about:blank'}")
+                    continue  # End this loop iteration, don't start the standard agent
+                
+                # --- TRAINING MODE: STANDARD AGENT ---
+
+                # Callbacks that send messages directly via WebSocket
+                def on_step(step: ActionStep, screenshot_b64: str):
+                    # Adjust step number with offset for accumulated display
+                    adjusted_step = step.model_copy(update={"step_number": step.step_number + step_offset})
+                    active_tasks[task_id]["steps"].append(adjusted_step)
+                    session_metrics.record_agent_turn()  # Track each agent step
+                    # Use asyncio.create_task to send without blocking
+                    asyncio.create_task(send_json({
+                        "type": "step",
+                        "step": adjusted_step.model_dump(exclude_none=True),
+                        "screenshot": screenshot_b64,
+                    }))
+
+                def on_status_change(status: TaskStatus, msg: str):
+                    active_tasks[task_id]["status"] = status
+                    asyncio.create_task(send_status(status.value, msg, task_id))
+
+                # Create persistent browser if not exists
+                if persistent_browser is None:
+                    persistent_browser = BrowserController()
                     
-                    # Create agent with PERSISTENT browser AND session context
-                    # The session_context is passed in - it lives across all tasks!
-                    agent = ComputerUseAgent(
-                        on_step=on_step,
-                        on_status_change=on_status_change,
-                        browser=persistent_browser,
-                        session_context=session_context,  # <-- THE KEY TO MEMORY!
-                        session_metrics=session_metrics,  # <-- REAL-TIME METRICS!
-                    )
-                    print(f"🤖 Agent created with session context: {session_context.session_id}")
+                    # Inject Auth State from Service
+                    auth_service = get_auth_service()
+                    storage_state = auth_service.get_storage_state()
+                    if storage_state:
+                        print("[WS] Starting browser with injected auth state")
+                    
+                    # Start browser explicitly to inject auth
+                    await persistent_browser.start(start_url, storage_state=storage_state)
+                    # NOTE: Changed from google.com to about:blank - no more unnecessary searches!
+                    print(f"[BROWSER] Browser started at: {start_url or 'about:blank'}")
+                
+                # Create agent with PERSISTENT browser AND session context
+                # The session_context is passed in - it lives across all tasks!
+                agent = ComputerUseAgent(
+                    on_step=on_step,
+                    on_status_change=on_status_change,
+                    browser=persistent_browser,
+                    session_context=session_context,  # <-- THE KEY TO MEMORY!
+                    session_metrics=session_metrics,  # <-- REAL-TIME METRICS!
+                )
+                print(f"🤖 Agent created with session context: {session_context.session_id}")
 
 
 
-                    # Run agent as an async task
-                    # Pass empty string if browser already open to avoid navigation
-                    effective_start_url = start_url if start_url else ""
-                    
-                    # ==============================================
-                    # SMART GOAL DECOMPOSITION
-                    # ==============================================
-                    recommended_workflow = None
-                    subtasks_to_execute = []
-                    
-                    # Skip decomposition for simple navigation goals
-                    simple_nav_pattern = r'^(go to|navigate to|open|visit)\s+https?://'
-                    is_simple_navigation = re.match(simple_nav_pattern, goal, re.IGNORECASE)
+                # Run agent as an async task
+                # Pass empty string if browser already open to avoid navigation
+                effective_start_url = start_url if start_url else ""
+                
+                # ==============================================
+                # SMART GOAL DECOMPOSITION
+                # ==============================================
+                recommended_workflow = None
+                subtasks_to_execute = []
+                
+                # Skip decomposition for simple navigation goals
+                simple_nav_pattern = r'^(go to|navigate to|open|visit)\s+https?://'
+                is_simple_navigation = re.match(simple_nav_pattern, goal, re.IGNORECASE)
+                
+                # ==============================================
+                # HAMMER DOWNLOAD DETECTION - BYPASS BROWSER!
+                # Uses browser cookies for authenticated API calls
+                # ==============================================
+                if is_hammer_download_intent(goal):
+                    company = extract_company_from_goal(goal)
+                    logger.info("hammer_detected", company=company)
                     
-                    # ==============================================
-                    # HAMMER DOWNLOAD DETECTION - BYPASS BROWSER!
-                    # Uses browser cookies for authenticated API calls
-                    # ==============================================
-                    if is_hammer_download_intent(goal):
-                        print(f"\n[HAMMER] HAMMER DOWNLOAD DETECTED - USING DIRECT API!")
-                        company = extract_company_from_goal(goal)
+                    if company:
+                        await send_status("running", f"Downloading hammer from {company} via API...", task_id)
                         
-                        if company:
-                            await send_json({
-                                "type": "status",
-                                "status": "running",
-                                "message": f"Downloading hammer from {company} via API...",
-                                "task_id": task_id
-                            })
-                            
-                            try:
-                                # Extract cookies from browser session for authenticated API calls
-                                auth_cookie = None
-                                if persistent_browser and persistent_browser.is_started:
-                                    auth_cookie = await persistent_browser.get_auth_cookies_header()
-                                    if auth_cookie:
-                                        print(f"[AUTH] Using browser session cookies for API auth")
-                                        print(f"[AUTH] Cookie length: {len(auth_cookie)} chars")
-                                    else:
-                                        print(f"[AUTH] WARNING: No cookies found - API may return 401")
-                                        print(f"[AUTH] Make sure to login first before downloading hammer!")
-                                else:
-                                    print(f"[AUTH] WARNING: No browser session - please login first!")
-                                    await send_json({
-                                        "type": "error",
-                                        "message": "Please login first before downloading hammer files"
-                                    })
-                                    continue
-                                
-                                
-                                # Fetch company registry from static_data namespace
-                                print(f"[HAMMER] Fetching company registry from static_data...")
-                                companies_list = []
-                                try:
-                                    static_records = pinecone_service.find_all_static_data(limit=10)
-                                    for record in static_records:
-                                        data = record.get("data", "")
-                                        if data:
-                                            try:
-                                                parsed = json.loads(data) if isinstance(data, str) else data
-                                                if isinstance(parsed, list):
-                                                    # Each item should have company_name, id, etc.
-                                                    companies_list.extend(parsed)
-                                            except json.JSONDecodeError:
-                                                pass  # Skip non-JSON records
-                                    
-                                    if companies_list:
-                                        print(f"[HAMMER] Loaded {len(companies_list)} companies from static_data")
-                                    else:
-                                        print("[HAMMER] WARNING: No companies found in static_data namespace")
-                                        
-                                except Exception as e:
-                                    print(f"[ERROR] Failed to load company registry from static_data: {e}")
-
-                                # Create downloader with browser cookies AND dynamic companies list
-                                downloader = get_hammer_downloader(auth_cookie=auth_cookie, companies=companies_list)
-                                result = await downloader.download_and_index(company)
-                                
-                                if result.get("success"):
-                                    await send_json({
-                                        "type": "status",
-                                        "status": "completed",
-                                        "message": f"Hammer indexed: {result.get('records_count', 0)} records from {result.get('company_name')}"
-                                    })
-                                    await send_json({
-                                        "type": "completed",
-                                        "workflow_id": task_id,
-                                        "step_count": 1,
-                                        "hammer_result": result
-                                    })
-                                    
-                                    # Update session context
-                                    session_context.important_notes["hammer_company"] = result.get("company_name")
-                                    session_context.important_notes["hammer_records"] = str(result.get("records_count", 0))
-                                    session_context.important_notes["hammer_file"] = result.get("filename", "")
-                                else:
-                                    error_msg = result.get("error", "Unknown error")
-                                    # Check if it's an auth error
-                                    if "401" in str(error_msg) or "Unauthorized" in str(error_msg):
-                                        error_msg = "Authentication failed. Please login to Graphite first, then try downloading again."
-                                    await send_json({
-                                        "type": "error",
-                                        "message": f"Hammer download failed: {error_msg}"
-                                    })
-                            except Exception as e:
-                                import traceback
-                                traceback.print_exc()
+                        try:
+                            if not (persistent_browser and persistent_browser.is_started):
+                                logger.warning("hammer_no_browser_session")
                                 await send_json({
                                     "type": "error",
-                                    "message": f"Hammer download error: {str(e)}"
+                                    "message": "Please login first before downloading hammer files"
                                 })
+                                continue
                             
-                            continue  # Skip agent execution - hammer is done!
-                        else:
-                            # Could not extract company, let agent try
-                            print(f"[HAMMER] Could not extract company from goal, falling back to agent")
-                    
-                    if is_simple_navigation:
-                        print(f"[NAV] Simple URL navigation detected - skipping decomposition")
-                    else:
-                        try:
-                            # Initialize goal decomposer with Pinecone service
-                            decomposer = get_goal_decomposer(pinecone_service)
+                            # Cookie extraction (browser) and the company registry fetch
+                            # (static_data namespace) are independent I/O - run them together
+                            auth_cookie, companies_list = await asyncio.gather(
+                                persistent_browser.get_auth_cookies_header(),
+                                _get_companies_registry(session_context),
+                            )
                             
-                            # Check if goal contains multiple tasks
-                            execution_plan = decomposer.get_execution_plan(goal)
+                            if auth_cookie:
+                                logger.info("hammer_auth_cookies", cookie_chars=len(auth_cookie))
+                            else:
+                                logger.warning("hammer_auth_cookies_missing")
                             
-                            print(f"\n[DECOMP] GOAL DECOMPOSITION RESULT:")
-                            print(f"   Original goal: {goal}")
-                            print(f"   Decomposed: {execution_plan['is_decomposed']}")
-                            print(f"   Sub-tasks: {execution_plan['subtask_count']}")
+                            if companies_list:
+                                logger.info("hammer_registry_loaded", company_count=len(companies_list))
+                            else:
+                                logger.warning("hammer_registry_empty")
+
+                            # Create downloader with browser cookies AND dynamic companies list
+                            downloader = get_hammer_downloader(auth_cookie=auth_cookie, companies=companies_list)
+                            result = await downloader.download_and_index(company)
                             
-                            if execution_plan['is_decomposed'] and execution_plan['subtask_count'] > 1:
-                                # Multiple sub-tasks detected
-                                print(f"[PLAN] EXECUTING {execution_plan['subtask_count']} SUB-TASKS SEQUENTIALLY:")
-                                
-                                for i, subtask in enumerate(execution_plan['subtasks'], 1):
-                                    print(f"   {i}. {subtask.action}: {subtask.target}")
-                                    if subtask.workflow_match:
-                                        print(f"      [OK] Matched workflow: {subtask.workflow_match.get('goal_description', 'N/A')}")
-                                
-                                subtasks_to_execute = execution_plan['subtasks']
-                                
-                                # Notify frontend
+                            if result.get("success"):
+                                await send_status("completed", f"Hammer indexed: {result.get('records_count', 0)} records from {result.get('company_name')}")
                                 await send_json({
-                                    "type": "status", 
-                                    "status": "planning",
-                                    "message": f"Decomposed into {len(subtasks_to_execute)} tasks: {', '.join([st.action for st in subtasks_to_execute])}"
+                                    "type": "completed",
+                                    "workflow_id": task_id,
+                                    "step_count": 1,
+                                    "hammer_result": result
                                 })
-                            else:
-                                # Single task - try to match workflow directly
-                                print(f"[PLAN] Single task detected, searching workflow...")
-                                
-                                # Generate embedding
-                                # Generate embedding
-                                from screenshot_embedder import get_embedder
-                                embedder = get_embedder()
-                                embedding = embedder.embed_query(goal)
-                                
-                                # Extract keywords from goal for fallback
-                                keywords = decomposer._extract_keywords(goal)
-                                
-                                # Search matches with TIERED thresholds
-                                matches = pinecone_service.find_similar_steps(embedding, top_k=3, namespace="test_execution_steps")
-                                print(f"[DEBUG] DEBUG: Raw matches found: {[(m.get('goal_description'), m.get('score')) for m in matches]}")
                                 
-                                # Use tiered matching with keyword fallback
-                                best_match = pinecone_service.get_best_step_for_goal_tiered(
-                                    embedding, 
-                                    keywords=keywords,
-                                    namespace="test_execution_steps"
+                                # Update session context
+                                session_context.record_hammer_index(
+                                    result.get("records_count", 0),
+                                    company=result.get("company_name"),
+                                    filename=result.get("filename", "")
                                 )
-                                
-                                if best_match:
-                                    # ==============================================
-                                    # CHECK FORMAT: JSON_V2 (clean JSON) vs TEXT (old) vs LEGACY (step_details)
-                                    # ==============================================
-                                    if best_match.get("format") == "json_v2":
-                                        # JSON_V2 FORMAT - new clean format with JSON strings
-                                        print(f"[JSON_V2 FORMAT] Found workflow (score: {best_match.get('score', 'N/A')})")
-                                        recommended_workflow = {
-                                            "name": f"Previous: {goal}",
-                                            "format": "json_v2",
-                                            "urls_visited": best_match.get("urls_visited", "[]"),
-                                            "actions": best_match.get("actions", "{}"),
-                                            "steps": best_match.get("steps", "[]"),
-                                            "user_prompts": best_match.get("user_prompts", "[]"),
-                                        }
-                                        workflow_name = recommended_workflow["name"]
-                                        
-                                        print(f"[OK] Context Loaded from JSON_V2 FORMAT workflow")
-                                        print(f"   URLs: {best_match.get('urls_visited', '')[:100]}...")
-                                        
-                                        await send_json({
-                                            "type": "status", 
-                                            "status": "planning",
-                                            "message": f"Found similar workflow (score: {best_match.get('score', 0):.2f})",
-                                            "task_id": task_id
-                                        })
-                                    elif best_match.get("user_prompts") or best_match.get("system_logs"):
-                                        # OLD TEXT FORMAT - test_execution_steps namespace
-                                        print(f"[TEXT FORMAT] Found workflow with system_logs (score: {best_match.get('score', 'N/A')})")
-                                        recommended_workflow = {
-                                            "name": f"Previous: {goal}",
-                                            "format": "new",
-                                            "urls_visited": best_match.get("urls_visited", ""),
-                                            "actions_performed": best_match.get("actions_performed", ""),
-                                            "system_logs": best_match.get("system_logs", ""),
-                                            "user_prompts": best_match.get("user_prompts", ""),
-                                        }
-                                        workflow_name = recommended_workflow["name"]
-                                        
-                                        # Show preview of what was found
-                                        print(f"[OK] Context Loaded from TEXT FORMAT workflow")
-                                        print(f"   URLs visited: {best_match.get('urls_visited', '')[:200]}...")
-                                        print(f"   Actions: {best_match.get('actions_performed', '')[:200]}...")
-                                        
-                                        await send_json({
-                                            "type": "status", 
-                                            "status": "planning",
-                                            "message": f"Found similar workflow (score: {best_match.get('score', 0):.2f})",
-                                            "task_id": task_id
-                                        })
-                                    else:
-                                        # OLD FORMAT - parse step_details JSON
-                                        print(f"[OLD FORMAT] Found workflow match: {best_match.get('goal_description')} (score: {best_match.get('score', 'N/A')})")
-                                        raw_details = best_match.get("step_details", "{}")
-                                        
-                                        # Handle case where it might be already dict or string
-                                        if isinstance(raw_details, str):
-                                            try:
-                                                recommended_workflow = json.loads(raw_details)
-                                            except:
-                                                try:
-                                                    import ast
-                                                    recommended_workflow = ast.literal_eval(raw_details)
-                                                    print("[DEBUG] Successfully parsed workflow using ast.literal_eval (legacy format)")
-                                                except Exception as e:
-                                                    print(f"[WARNING] Failed to parse workflow details: {e}")
-                                                    pass
-                                        elif isinstance(raw_details, dict):
-                                            recommended_workflow = raw_details
-
-                                        if recommended_workflow:
-                                            workflow_name = recommended_workflow.get("name") or best_match.get("workflow_name") or "Previous Run"
-                                            steps = recommended_workflow.get("steps", [])
-                                            step_count = len(steps)
-                                            print(f"[OK] Context Loaded: '{workflow_name}' with {step_count} steps.")
-                                            
-                                            # Debug: Show what's in the steps
-                                            print(f"[WORKFLOW] WORKFLOW STEPS DETAIL:")
-                                            for i, s in enumerate(steps[:5], 1):  # Show first 5
-                                                s_action = s.get("action_type") if isinstance(s, dict) else s.action_type
-                                                s_args = s.get("args") if isinstance(s, dict) else s.args
-                                                print(f"   Step {i}: {s_action} | args={s_args}")
-                                            
-                                            await send_json({
-                                                "type": "status", 
-                                                "status": "planning",
-                                                "message": f"loading knowledge from: {workflow_name}",
-                                                "task_id": task_id
-                                            })
-                                else:
-                                    print(f"[WARNING] No workflow match found for: {goal}")
+                            else:
+                                error_msg = result.get("error", "Unknown error")
+                                # Check if it's an auth error
+                                if "401" in str(error_msg) or "Unauthorized" in str(error_msg):
+                                    error_msg = "Authentication failed. Please login to Graphite first, then try downloading again."
+                                await send_json({
+                                    "type": "error",
+                                    "message": f"Hammer download failed: {error_msg}"
+                                })
                         except Exception as e:
-                            print(f"Error in goal decomposition: {e}")
-                            import traceback
-                            traceback.print_exc()
-
-                    async def run_agent_task():
-                        try:
-                            # Check if we have decomposed subtasks to execute
-                            if subtasks_to_execute and len(subtasks_to_execute) > 1:
+                            logger.exception("hammer_failed", company=company)
+                            await send_json({
+                                "type": "error",
+                                "message": f"Hammer download error: {str(e)}"
+                            })
+                        
+                        continue  # Skip agent execution - hammer is done!
+                    else:
+                        # Could not extract company, let agent try
+                        logger.info("hammer_company_not_found", fallback="agent")
+                
+                if is_simple_navigation:
+                    print(f"[NAV] Simple URL navigation detected - skipping decomposition")
+                else:
+                    embed_task = None
+                    try:
+                        # Start the goal embedding (served from EmbeddingCache on repeats) while
+                        # the decomposer runs - single-task matching needs it next
+                        embed_task = asyncio.create_task(asyncio.to_thread(cached_embed_query, goal))
+                        
+                        # Initialize goal decomposer with Pinecone service
+                        decomposer = get_goal_decomposer(pinecone_service)
+                        
+                        # Check if goal contains multiple tasks (LLM + Pinecone, blocking)
+                        execution_plan = await asyncio.to_thread(decomposer.get_execution_plan, goal)
+                        
+                        print(f"\n[DECOMP] GOAL DECOMPOSITION RESULT:")
+                        print(f"   Original goal: {goal}")
+                        print(f"   Decomposed: {execution_plan['is_decomposed']}")
+                        print(f"   Sub-tasks: {execution_plan['subtask_count']}")
+                        
+                        if execution_plan['is_decomposed'] and execution_plan['subtask_count'] > 1:
+                            # Multiple sub-tasks detected
+                            print(f"[PLAN] EXECUTING {execution_plan['subtask_count']} SUB-TASKS SEQUENTIALLY:")
+                            
+                            for i, subtask in enumerate(execution_plan['subtasks'], 1):
+                                print(f"   {i}. {subtask.action}: {subtask.target}")
+                                if subtask.workflow_match:
+                                    print(f"      [OK] Matched workflow: {subtask.workflow_match.get('goal_description', 'N/A')}")
+                            
+                            subtasks_to_execute = execution_plan['subtasks']
+                            embed_task.cancel()  # Goal embedding not needed for subtasks
+                            
+                            # Notify frontend
+                            await send_status("planning", f"Decomposed into {len(subtasks_to_execute)} tasks: {', '.join([st.action for st in subtasks_to_execute])}")
+                        else:
+                            # Single task - try to match workflow directly
+                            print(f"[PLAN] Single task detected, searching workflow...")
+                            
+                            embedding = await embed_task
+                            
+                            # Near-duplicate goals reuse the previous match - no Pinecone round-trips
+                            match_cache = get_match_cache()
+                            best_match = match_cache.get(embedding)
+                            
+                            if best_match:
+                                logger.info("workflow_match_cache_hit", score=best_match.get("score"))
+                            else:
+                                # Tiered matching selects by score, so fetch the top 20 by score as-is
+                                matches = await submit_step_query(
+                                    embedding, top_k=20, namespace="test_execution_steps",
+                                    min_score=STEP_MATCH_MIN_SCORE,
+                                    prefer_recent=False, overfetch_factor=1
+                                )
+                                if logger.is_enabled_for(logging.DEBUG):
+                                    logger.debug("workflow_raw_matches", matches=[(m.get("goal_description"), m.get("score")) for m in matches[:3]])
+                                
+                                # Tiered matching with keyword fallback (returns early on a
+                                # high-confidence match)
+                                best_match = pinecone_service.get_best_step_for_goal_tiered(
+                                    embedding, 
+                                    keywords=extract_keywords(goal),
+                                    namespace="test_execution_steps",
+                                    matches=matches
+                                )
+                                if best_match:
+                                    match_cache.put(embedding, best_match)
+                            
+                            if best_match:
                                 # ==============================================
-                                # SEQUENTIAL SUBTASK EXECUTION
+                                # CHECK FORMAT: JSON_V2 (clean JSON) vs TEXT (old) vs LEGACY (step_details)
                                 # ==============================================
-                                print(f"\n[RUN] EXECUTING {len(subtasks_to_execute)} SUBTASKS SEQUENTIALLY")
-                                
-                                total_steps = 0
-                                all_workflows = []
-                                
-                                for i, subtask in enumerate(subtasks_to_execute, 1):
-                                    print(f"\n{'='*50}")
-                                    print(f"[SUBTASK] SUBTASK {i}/{len(subtasks_to_execute)}: {subtask.action}")
-                                    print(f"   Target: {subtask.target}")
-                                    print(f"{'='*50}")
+                                bm_get = best_match.get
+                                match_score = bm_get("score", 0)
+                                user_prompts = bm_get("user_prompts")
+                                if bm_get("format") == "json_v2":
+                                    # JSON_V2 FORMAT - new clean format with JSON strings
+                                    logger.info("workflow_match_found", format="json_v2", score=match_score)
+                                    recommended_workflow = {
+                                        "name": f"Previous: {goal}",
+                                        "format": "json_v2",
+                                        **_decode_json_v2_fields(best_match),
+                                    }
+                                    workflow_name = recommended_workflow["name"]
                                     
-                                    # Get workflow from subtask match
-                                    subtask_workflow = None
-                                    if subtask.workflow_match:
-                                        raw_details = subtask.workflow_match.get("step_details", "{}")
-                                        if isinstance(raw_details, str):
-                                            try:
-                                                subtask_workflow = json.loads(raw_details)
-                                            except:
-                                                try:
-                                                    import ast
-                                                    subtask_workflow = ast.literal_eval(raw_details)
-                                                except:
-                                                    pass
-                                        elif isinstance(raw_details, dict):
-                                            subtask_workflow = raw_details
+                                    if logger.is_enabled_for(logging.DEBUG):
+                                        logger.debug("workflow_context_loaded", format="json_v2", urls=recommended_workflow["urls_visited"][:10])
                                     
-                                    # Notify frontend of current subtask
-                                    await send_json({
-                                        "type": "status",
-                                        "status": "running",
-                                        "message": f"Subtask {i}/{len(subtasks_to_execute)}: {subtask.action} {subtask.target}",
-                                        "task_id": task_id
-                                    })
+                                    await send_status("planning", f"Found similar workflow (score: {match_score:.2f})", task_id)
+                                elif user_prompts or bm_get("system_logs"):
+                                    # OLD TEXT FORMAT - test_execution_steps namespace
+                                    logger.info("workflow_match_found", format="text", score=match_score)
+                                    urls = bm_get("urls_visited", "")
+                                    actions = bm_get("actions_performed", "")
+                                    recommended_workflow = {
+                                        "name": f"Previous: {goal}",
+                                        "format": "new",
+                                        "urls_visited": urls,
+                                        "actions_performed": actions,
+                                        "system_logs": bm_get("system_logs", ""),
+                                        "user_prompts": user_prompts or "",
+                                    }
+                                    workflow_name = recommended_workflow["name"]
                                     
-                                    # Build subtask goal
-                                    subtask_goal = f"{subtask.action} {subtask.target}"
+                                    # Show preview of what was found
+                                    if logger.is_enabled_for(logging.DEBUG):
+                                        logger.debug(
+                                            "workflow_context_loaded",
+                                            format="text",
+                                            urls=urls[:200],
+                                            actions=actions[:200],
+                                        )
                                     
-                                    # ==============================================
-                                    # CHECK IF THIS SUBTASK IS A HAMMER DOWNLOAD
-                                    # ==============================================
-                                    if is_hammer_download_intent(subtask_goal):
-                                        print(f"\n[HAMMER] SUBTASK IS HAMMER DOWNLOAD - USING DIRECT API!")
-                                        company = extract_company_from_goal(subtask_goal)
+                                    await send_status("planning", f"Found similar workflow (score: {match_score:.2f})", task_id)
+                                else:
+                                    # OLD FORMAT - parse step_details JSON
+                                    logger.info("workflow_match_found", format="step_details", goal_description=bm_get("goal_description"), score=match_score)
+                                    recommended_workflow = _decode_workflow(bm_get("step_details", "{}"))
+
+                                    if recommended_workflow:
+                                        workflow_name = recommended_workflow.get("name") or bm_get("workflow_name") or "Previous Run"
+                                        steps = recommended_workflow.get("steps", [])
+                                        logger.info("workflow_context_loaded", workflow_name=workflow_name, step_count=len(steps))
+                                        
+                                        # Debug: Show the first 5 steps
+                                        if logger.is_enabled_for(logging.DEBUG):
+                                            logger.debug("workflow_steps_head", steps=steps[:5])
                                         
-                                        if company:
-                                            try:
-                                                # Extract cookies from browser session
-                                                auth_cookie = None
-                                                if persistent_browser and persistent_browser.is_started:
-                                                    auth_cookie = await persistent_browser.get_auth_cookies_header()
-                                                    if auth_cookie:
-                                                        print(f"[AUTH] Using browser session cookies for API auth")
+                                        await send_status("planning", f"loading knowledge from: {workflow_name}", task_id)
+                            else:
+                                logger.warning("workflow_match_none", goal=goal)
+                    except Exception:
+                        logger.exception("goal_decomposition_failed")
+                        if embed_task is not None:
+                            embed_task.cancel()
+
+                async def run_agent_task():
+                    try:
+                        # Check if we have decomposed subtasks to execute
+                        if subtasks_to_execute and len(subtasks_to_execute) > 1:
+                            # ==============================================
+                            # SEQUENTIAL SUBTASK EXECUTION
+                            # ==============================================
+                            print(f"\n[RUN] EXECUTING {len(subtasks_to_execute)} SUBTASKS SEQUENTIALLY")
+                            
+                            total_steps = 0
+                            all_workflows = []
+                            
+                            # Build subtask goals and decode matched workflows up front
+                            subtask_goals = [f"{st.action} {st.target}" for st in subtasks_to_execute]
+                            subtask_workflows = [
+                                _decode_workflow(st.workflow_match.get("step_details", "{}")) if st.workflow_match else None
+                                for st in subtasks_to_execute
+                            ]
+                            
+                            for i, subtask in enumerate(subtasks_to_execute, 1):
+                                print(f"\n{'='*50}")
+                                print(f"[SUBTASK] SUBTASK {i}/{len(subtasks_to_execute)}: {subtask.action}")
+                                print(f"   Target: {subtask.target}")
+                                print(f"{'='*50}")
+                                
+                                # Notify frontend of current subtask
+                                await send_status("running", f"Subtask {i}/{len(subtasks_to_execute)}: {subtask.action} {subtask.target}", task_id)
+                                
+                                subtask_goal = subtask_goals[i - 1]
+                                subtask_workflow = subtask_workflows[i - 1]
+                                
+                                # ==============================================
+                                # CHECK IF THIS SUBTASK IS A HAMMER DOWNLOAD
+                                # ==============================================
+                                if is_hammer_download_intent(subtask_goal):
+                                    company = extract_company_from_goal(subtask_goal)
+                                    logger.info("hammer_detected", company=company, subtask=i)
+                                    
+                                    if company:
+                                        try:
+                                            # Extract cookies from browser session
+                                            auth_cookie = None
+                                            if persistent_browser and persistent_browser.is_started:
+                                                auth_cookie = await persistent_browser.get_auth_cookies_header()
+                                                if auth_cookie:
+                                                    logger.info("hammer_auth_cookies", cookie_chars=len(auth_cookie))
+                                            
+                                            # Company registry from static_data (cached per session)
+                                            companies_list = await _get_companies_registry(session_context)
+                                            
+                                            if companies_list:
+                                                logger.info("hammer_registry_loaded", company_count=len(companies_list))
+                                            else:
+                                                logger.warning("hammer_registry_empty")
+
+                                            # Create downloader with browser cookies AND companies
+                                            downloader = get_hammer_downloader(auth_cookie=auth_cookie, companies=companies_list)
+                                            result = await downloader.download_and_index(company)
+                                            
+                                            if result.get("success"):
+                                                await send_status("completed", f"Hammer indexed: {result.get('records_count', 0)} records from {result.get('company_name')}", task_id)
                                                 
-                                                # Fetch company registry from static_data namespace
-                                                companies_list = []
-                                                try:
-                                                    static_records = pinecone_service.find_all_static_data(limit=10)
-                                                    for record in static_records:
-                                                        data = record.get("data", "")
-                                                        if data:
-                                                            try:
-                                                                parsed = json.loads(data) if isinstance(data, str) else data
-                                                                if isinstance(parsed, list):
-                                                                    companies_list.extend(parsed)
-                                                            except json.JSONDecodeError:
-                                                                pass
-                                                    
-                                                    if companies_list:
-                                                        print(f"[HAMMER] Loaded {len(companies_list)} companies from static_data")
-                                                    else:
-                                                        print("[HAMMER] WARNING: No companies found in static_data namespace")
-                                                except Exception as e:
-                                                    print(f"[ERROR] Failed to load company registry from static_data: {e}")
-
-                                                # Create downloader with browser cookies AND companies
-                                                downloader = get_hammer_downloader(auth_cookie=auth_cookie, companies=companies_list)
-                                                result = await downloader.download_and_index(company)
+                                                # Update session context
+                                                session_context.record_hammer_index(
+                                                    result.get("records_count", 0),
+                                                    company=result.get("company_name")
+                                                )
                                                 
-                                                if result.get("success"):
-                                                    await send_json({
-                                                        "type": "status",
-                                                        "status": "completed", 
-                                                        "message": f"Hammer indexed: {result.get('records_count', 0)} records from {result.get('company_name')}",
-                                                        "task_id": task_id
-                                                    })
-                                                    
-                                                    # Update session context
-                                                    session_context.important_notes["hammer_company"] = result.get("company_name")
-                                                    session_context.important_notes["hammer_records"] = str(result.get("records_count", 0))
-                                                    
-                                                    total_steps += 1
-                                                    continue  # Skip to next subtask
-                                                else:
-                                                    print(f"[ERROR] Hammer download failed: {result.get('error')}")
-                                                    # Don't continue - let agent try as fallback
-                                            except Exception as e:
-                                                print(f"[ERROR] Hammer download exception: {e}")
+                                                total_steps += 1
+                                                continue  # Skip to next subtask
+                                            else:
+                                                logger.warning("hammer_failed", company=company, error=result.get("error"))
                                                 # Don't continue - let agent try as fallback
-                                    
-                                    # Run agent for this subtask (normal browser automation)
-                                    workflow = await agent.run(
-                                        subtask_goal, 
-                                        effective_start_url if i == 1 else "",  # Only use start_url for first subtask
-                                        previous_workflow=subtask_workflow
-                                    )
-                                    
-                                    total_steps += len(workflow.steps)
-                                    all_workflows.append(workflow)
-                                    
-                                    print(f"   [OK] Subtask {i} completed with {len(workflow.steps)} steps")
+                                        except Exception:
+                                            logger.exception("hammer_failed", company=company)
+                                            # Don't continue - let agent try as fallback
                                 
-                                print(f"\n[COMPLETE] ALL {len(subtasks_to_execute)} SUBTASKS COMPLETED! Total steps: {total_steps}")
+                                # Run agent for this subtask (normal browser automation)
+                                workflow = await agent.run(
+                                    subtask_goal, 
+                                    effective_start_url if i == 1 else "",  # Only use start_url for first subtask
+                                    previous_workflow=subtask_workflow
+                                )
                                 
-                                await send_json({
-                                    "type": "completed",
-                                    "workflow_id": all_workflows[-1].id if all_workflows else task_id,
-                                    "step_count": total_steps,
-                                    "subtasks_completed": len(subtasks_to_execute),
-                                    "task_id": task_id
-                                })
-                            else:
-                                # ==============================================
-                                # SINGLE TASK EXECUTION (original behavior)
-                                # ==============================================
-                                workflow = await agent.run(goal, effective_start_url, previous_workflow=recommended_workflow)
-                                session_metrics.record_task_completed()
-                                await send_json({
-                                    "type": "completed",
-                                    "workflow_id": workflow.id,
-                                    "step_count": len(workflow.steps),
-                                    "task_id": task_id
-                                })
-                        except asyncio.CancelledError:
-                            session_metrics.record_task_failed()
+                                total_steps += len(workflow.steps)
+                                all_workflows.append(workflow)
+                                
+                                print(f"   [OK] Subtask {i} completed with {len(workflow.steps)} steps")
+                            
+                            print(f"\n[COMPLETE] ALL {len(subtasks_to_execute)} SUBTASKS COMPLETED! Total steps: {total_steps}")
+                            
                             await send_json({
-                                "type": "status",
-                                "status": "stopped",
-                                "message": "Task cancelled",
+                                "type": "completed",
+                                "workflow_id": all_workflows[-1].id if all_workflows else task_id,
+                                "step_count": total_steps,
+                                "subtasks_completed": len(subtasks_to_execute),
                                 "task_id": task_id
                             })
-                        except Exception as e:
-                            session_metrics.record_task_failed()
-                            import traceback
-                            traceback.print_exc()
+                        else:
+                            # ==============================================
+                            # SINGLE TASK EXECUTION (original behavior)
+                            # ==============================================
+                            workflow = await agent.run(goal, effective_start_url, previous_workflow=recommended_workflow)
+                            session_metrics.record_task_completed()
                             await send_json({
-                                "type": "error",
-                                "message": str(e),
+                                "type": "completed",
+                                "workflow_id": workflow.id,
+                                "step_count": len(workflow.steps),
                                 "task_id": task_id
                             })
-
-                    agent_task = asyncio.create_task(run_agent_task())
-
-                elif msg_type == "stop":
-                    if agent:
-                        agent.stop()
-                        await send_json({
-                            "type": "status",
-                            "status": "stopping",
-                            "message": "Stop requested",
-                        })
-
-                elif msg_type == "close_browser":
-                    if persistent_browser:
-                        await persistent_browser.stop()
-                        persistent_browser = None
+                    except asyncio.CancelledError:
+                        session_metrics.record_task_failed()
+                        await send_status("stopped", "Task cancelled", task_id)
+                    except Exception as e:
+                        session_metrics.record_task_failed()
+                        traceback.print_exc()
                         await send_json({
-                            "type": "status",
-                            "status": "idle",
-                            "message": "Browser closed",
+                            "type": "error",
+                            "message": str(e),
+                            "task_id": task_id
                         })
 
-                elif msg_type == "end_session":
-                    # ==============================================
-                    # END SESSION - CLEAR ALL MEMORY
-                    # ==============================================
-                    print(f"\n[END] SESSION ENDING: {session_context.session_id}")
-                    print(f"   Tasks completed: {len(session_context.task_history)}")
-                    print(f"   Values copied: {session_context.last_copied_values}")
-                    
-                    # Stop any running task
-                    if agent:
-                        agent.stop()
-                    if agent_task and not agent_task.done():
-                        agent_task.cancel()
-                        try:
-                            await agent_task
-                        except asyncio.CancelledError:
-                            pass
-                    
-                    # Close browser
-                    if persistent_browser:
-                        await persistent_browser.stop()
-                        persistent_browser = None
-                    
-                    # RESET session context to fresh state
-                    session_context = SessionContext(
-                        session_id=str(uuid.uuid4()),
-                        created_at=datetime.now().isoformat()
+                agent_task = asyncio.create_task(run_agent_task())
+
+            elif msg_type == "stop":
+                if agent:
+                    agent.stop()
+                    await send_status("stopping", "Stop requested")
+
+            elif msg_type == "close_browser":
+                if persistent_browser:
+                    await persistent_browser.stop()
+                    persistent_browser = None
+                    await send_status("idle", "Browser closed")
+
+            elif msg_type == "end_session":
+                # ==============================================
+                # END SESSION - CLEAR ALL MEMORY
+                # ==============================================
+                print(f"\n[END] SESSION ENDING: {session_context.session_id}")
+                print(f"   Tasks completed: {session_context.tasks_completed}")
+                print(f"   Hammer records indexed: {sum(session_context.hammer_record_counts)}")
+                print(f"   Values copied: {session_context.last_copied_values}")
+                
+                # Stop any running task
+                if agent:
+                    agent.stop()
+                if agent_task and not agent_task.done():
+                    agent_task.cancel()
+                    try:
+                        await agent_task
+                    except asyncio.CancelledError:
+                        pass
+                
+                # Close browser
+                if persistent_browser:
+                    await persistent_browser.stop()
+                    persistent_browser = None
+                
+                # RESET session context to fresh state
+                session_context = SessionContext(
+                    session_id=uuid.uuid4().hex
+                )
+                
+                await send_status("idle", f"Session ended. Memory cleared. New session: {session_context.session_id}")
+                print(f"[SESSION] NEW SESSION CREATED: {session_context.session_id}")
+
+            elif msg_type == "index_hammer":
+                # ==============================================
+                # INDEX HAMMER FILE INTO PINECONE
+                # ==============================================
+                file_path = message.get("file_path")
+                
+                if not file_path:
+                    # Try to find the latest downloaded hammer
+                    tracker = get_download_tracker()
+                    file_path = tracker.get_latest_xlsm()
+                
+                if not file_path:
+                    await send_json({
+                        "type": "error",
+                        "message": "No hammer file found. Please download one first."
+                    })
+                    continue
+                
+                logger.info("hammer_index_started", file_name=os.path.basename(file_path))
+                
+                await send_status("indexing", f"Indexing {os.path.basename(file_path)}...")
+                
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        _hammer_process_pool, index_hammer_file, file_path, True
                     )
                     
                     await send_json({
-                        "type": "status",
-                        "status": "idle",
-                        "message": f"Session ended. Memory cleared. New session: {session_context.session_id}",
+                        "type": "hammer_indexed",
+                        "success": result.get("success", False),
+                        "records_count": result.get("records_count", 0),
+                        "sheets": result.get("sheets", []),
+                        "file_name": result.get("file_name", ""),
                     })
-                    print(f"[SESSION] NEW SESSION CREATED: {session_context.session_id}")
-
-                elif msg_type == "index_hammer":
-                    # ==============================================
-                    # INDEX HAMMER FILE INTO PINECONE
-                    # ==============================================
-                    file_path = message.get("file_path")
-                    
-                    if not file_path:
-                        # Try to find the latest downloaded hammer
-                        tracker = get_download_tracker()
-                        file_path = tracker.get_latest_xlsm()
                     
-                    if not file_path:
-                        await send_json({
-                            "type": "error",
-                            "message": "No hammer file found. Please download one first."
-                        })
-                        continue
-                    
-                    print(f"\n[INDEX] INDEXING HAMMER: {os.path.basename(file_path)}")
+                    # Add to session context
+                    session_context.record_hammer_index(
+                        result.get("records_count", 0),
+                        filename=os.path.basename(file_path)
+                    )
                     
+                except Exception as e:
+                    logger.exception("hammer_index_failed", file_name=os.path.basename(file_path))
                     await send_json({
-                        "type": "status",
-                        "status": "indexing",
-                        "message": f"Indexing {os.path.basename(file_path)}..."
+                        "type": "error",
+                        "message": f"Failed to index hammer: {str(e)}"
                     })
-                    
-                    try:
-                        indexer = get_hammer_indexer()
-                        result = indexer.index_hammer(file_path, clear_existing=True)
-                        
-                        await send_json({
-                            "type": "hammer_indexed",
-                            "success": result.get("success", False),
-                            "records_count": result.get("records_count", 0),
-                            "sheets": result.get("sheets", []),
-                            "file_name": result.get("file_name", ""),
-                        })
-                        
-                        # Add to session context
-                        session_context.important_notes["hammer_file"] = os.path.basename(file_path)
-                        session_context.important_notes["hammer_records"] = str(result.get("records_count", 0))
-                        
-                    except Exception as e:
-                        import traceback
-                        traceback.print_exc()
-                        await send_json({
-                            "type": "error",
-                            "message": f"Failed to index hammer: {str(e)}"
-                        })
+            
+            elif msg_type == "get_hammer_status":
+                # ==============================================
+                # GET CURRENT HAMMER INDEX STATUS
+                # ==============================================
+                stats = await asyncio.to_thread(pinecone_service.get_hammer_stats)
+                tracker = get_download_tracker()
+                latest = tracker.get_latest_xlsm()
                 
-                elif msg_type == "get_hammer_status":
-                    # ==============================================
-                    # GET CURRENT HAMMER INDEX STATUS
-                    # ==============================================
-                    stats = pinecone_service.get_hammer_stats()
-                    tracker = get_download_tracker()
-                    latest = tracker.get_latest_xlsm()
-                    
+                await send_json({
+                    "type": "hammer_status",
+                    "index_stats": stats,
+                    "latest_file": os.path.basename(latest) if latest else None,
+                    "has_data": stats.get("total_vector_count", 0) > 0,
+                })
+            
+            elif msg_type == "get_latest_hammer":
+                # ==============================================
+                # GET INFO ABOUT LATEST DOWNLOADED HAMMER
+                # ==============================================
+                tracker = get_download_tracker()
+                latest = tracker.get_latest_xlsm()
+                
+                if latest:
+                    info = tracker.get_hammer_info(latest)
                     await send_json({
-                        "type": "hammer_status",
-                        "index_stats": stats,
-                        "latest_file": os.path.basename(latest) if latest else None,
-                        "has_data": stats.get("total_vector_count", 0) > 0,
+                        "type": "latest_hammer",
+                        "found": True,
+                        "info": info,
                     })
-                
-                elif msg_type == "get_latest_hammer":
-                    # ==============================================
-                    # GET INFO ABOUT LATEST DOWNLOADED HAMMER
-                    # ==============================================
-                    tracker = get_download_tracker()
-                    latest = tracker.get_latest_xlsm()
-                    
-                    if latest:
-                        info = tracker.get_hammer_info(latest)
-                        await send_json({
-                            "type": "latest_hammer",
-                            "found": True,
-                            "info": info,
-                        })
-                    else:
-                        await send_json({
-                            "type": "latest_hammer",
-                            "found": False,
-                            "message": "No hammer files found in Downloads folder"
-                        })
-
-                elif msg_type == "ping":
-                    await send_json({"type": "pong"})
-
-                elif msg_type == "execute_test_plan":
-                    # ==============================================
-                    # DIRECT TEST PLAN EXECUTION (Alternative method)
-                    # ==============================================
-                    test_plan = message.get("test_plan")
-                    options = message.get("options", {})
-
-                    if not test_plan:
-                        await send_json({"type": "error", "message": "test_plan is required"})
-                        continue
-
-                    print(f"[TEST PLAN] Direct execution: {test_plan.get('test_case_id', 'Unknown')}")
-
+                else:
                     await send_json({
-                        "type": "status",
-                        "status": "running",
-                        "message": f"Executing: {test_plan.get('test_case_id', 'Test Plan')}"
+                        "type": "latest_hammer",
+                        "found": False,
+                        "message": "No hammer files found in Downloads folder"
                     })
 
-                    task_id = str(uuid.uuid4())
+            elif msg_type == "ping":
+                await send_json({"type": "pong"})
 
-                    # Create browser if needed
-                    if persistent_browser is None:
-                        persistent_browser = BrowserController()
-                        auth_service = get_auth_service()
-                        storage_state = auth_service.get_storage_state()
-                        await persistent_browser.start(storage_state=storage_state)
+            elif msg_type == "execute_test_plan":
+                # ==============================================
+                # DIRECT TEST PLAN EXECUTION (Alternative method)
+                # ==============================================
+                test_plan = message.get("test_plan")
+                options = message.get("options", {})
 
-                    # Create Semantic QA Agent
-                    semantic_agent = SemanticQAAgent(
-                        browser=persistent_browser,
-                        session_metrics=session_metrics
-                    )
+                if not test_plan:
+                    await send_json({"type": "error", "message": "test_plan is required"})
+                    continue
 
-                    async def run_direct_test_plan():
-                        try:
-                            result = await semantic_agent.execute_test_plan(
-                                test_plan,
-                                stop_on_failure=options.get("stop_on_failure", True),
-                                max_retries_per_step=options.get("max_retries", 3)
-                            )
+                logger.info("test_plan_direct_execution", test_case_id=test_plan.get("test_case_id", "Unknown"))
 
-                            for step_result in result.steps_results:
-                                status_emoji = "✓" if step_result.status == "pass" else "✗" if step_result.status == "fail" else "○"
-                                await send_json({
-                                    "type": "message",
-                                    "role": "agent",
-                                    "content": f"{status_emoji} Step {step_result.step_id} ({step_result.action}): {step_result.status.upper()}"
-                                })
+                await send_status("running", f"Executing: {test_plan.get('test_case_id', 'Test Plan')}")
 
-                            summary = f"### Test Complete: {result.overall_status.upper()}\n"
-                            summary += f"Passed: {result.passed_steps} | Failed: {result.failed_steps} | Skipped: {result.skipped_steps}"
+                task_id = uuid.uuid4().hex
 
-                            await send_json({
-                                "type": "status",
-                                "status": "completed",
-                                "message": summary
-                            })
+                # Create browser if needed
+                if persistent_browser is None:
+                    persistent_browser = BrowserController()
+                    auth_service = get_auth_service()
+                    storage_state = auth_service.get_storage_state()
+                    await persistent_browser.start(storage_state=storage_state)
 
-                            await send_json({
-                                "type": "completed",
-                                "workflow_id": task_id,
-                                "test_result": result.model_dump()
-                            })
+                # Create Semantic QA Agent
+                semantic_agent = SemanticQAAgent(
+                    browser=persistent_browser,
+                    session_metrics=session_metrics
+                )
 
-                        except Exception as e:
-                            import traceback
-                            traceback.print_exc()
+                async def run_direct_test_plan():
+                    try:
+                        async for step_result in semantic_agent.execute_test_plan_iter(
+                            test_plan,
+                            stop_on_failure=options.get("stop_on_failure", True),
+                            max_retries_per_step=options.get("max_retries", 3)
+                        ):
+                            status_emoji = "✓" if step_result.status == "pass" else "✗" if step_result.status == "fail" else "○"
                             await send_json({
-                                "type": "error",
-                                "message": f"Test execution failed: {str(e)}"
+                                "type": "message",
+                                "role": "agent",
+                                "content": f"{status_emoji} Step {step_result.step_id} ({step_result.action}): {step_result.status.upper()}"
                             })
+                        result = semantic_agent.last_execution_result
 
-                    agent_task = asyncio.create_task(run_direct_test_plan())
+                        summary = f"### Test Complete: {result.overall_status.upper()}\n"
+                        summary += f"Passed: {result.passed_steps} | Failed: {result.failed_steps} | Skipped: {result.skipped_steps}"
 
-            except asyncio.TimeoutError:
-                # No message received, just continue the loop
-                # This allows us to check for agent completion
-                if agent_task and agent_task.done():
-                    # Check if task raised an exception
-                    try:
-                        agent_task.result()
-                    except Exception:
-                        pass  # Already handled in the task
-                continue
+                        await send_status("completed", summary)
+
+                        await send_frame(_completed_test_frame(task_id, result), "completed")
+
+                    except Exception as e:
+                        logger.exception("test_plan_failed", task_id=task_id)
+                        await send_json({
+                            "type": "error",
+                            "message": f"Test execution failed: {str(e)}"
+                        })
+
+                agent_task = asyncio.create_task(run_direct_test_plan())
 
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for task {task_id}")
@@ -1916,7 +2049,6 @@ async def websocket_endpoint(websocket: WebSocket):
             await persistent_browser.stop()
     except Exception as e:
         print(f"WebSocket error: {e}")
-        import traceback
         traceback.print_exc()
         try:
             await send_json({"type": "error", "message": str(e)})
@@ -1925,84 +2057,131 @@ async def websocket_endpoint(websocket: WebSocket):
         # Clean up browser on error
         if persistent_browser:
             await persistent_browser.stop()
+    finally:
+        metrics_flusher.cancel()
 
 
 
-@app.get("/reports/{task_id}/download")
-async def download_report(task_id: str):
-    """Download a zip report for a task."""
-    import zipfile
-    import io
-    from fastapi.responses import StreamingResponse
+# Screenshots are streamed into the report zip in chunks of this size; 1 MiB
+# covers a typical PNG in a single read while bounding per-download buffering
+REPORT_ZIP_CHUNK_SIZE = 1024 * 1024
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """Write-only, unseekable sink that collects zipfile output until drained.
     
-    print(f"Download report requested for task: {task_id}")
-    print(f"Active tasks: {list(active_tasks.keys())}")
+    zipfile detects the missing tell()/seek() and writes data descriptors,
+    so the archive can be produced front to back while it is being sent.
+    """
     
-    # Check active tasks first
-    task_data = active_tasks.get(task_id)
-    steps = []
+    def __init__(self):
+        self._chunks: List[bytes] = []
     
-    if task_data:
-        steps = task_data.get("steps", [])
-        print(f"Found {len(steps)} steps in active_tasks")
-    else:
-        # Check if saved workflow exists
-        workflow = load_workflow(task_id)
-        if workflow:
-            steps = workflow.steps
-            print(f"Found {len(steps)} steps in saved workflow")
+    def writable(self) -> bool:
+        return True
     
-    if not task_data and not steps:
-        print(f"Task not found: {task_id}")
-        raise HTTPException(status_code=404, detail=f"Task report not found. Active tasks: {list(active_tasks.keys())}")
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# ActionStep fields read by the report; everything else is skipped when dumping
+_REPORT_STEP_FIELDS = frozenset({"step_number", "timestamp", "action_type", "args", "reasoning"})
 
-    # Create Zip in memory
-    zip_buffer = io.BytesIO()
+
+def _iter_report_zip(task_id: str, steps: List) -> Iterator[bytes]:
+    """Yield a task's zip report (screenshots + report.md) chunk by chunk.
+    
+    Blocking file I/O - StreamingResponse iterates sync generators in a threadpool.
+    """
+    # One directory listing instead of a stat() per step
+    prefix = f"{task_id}_step_"
+    try:
+        with os.scandir(SCREENSHOTS_DIR) as entries:
+            available = {entry.name for entry in entries if entry.name.startswith(prefix)}
+    except FileNotFoundError:
+        available = set()
     
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        # 1. Add Report Summary (Markdown)
-        report_content = f"# Test Report - {task_id}\n\n"
-        report_content += f"Generated: {datetime.now().isoformat()}\n\n"
-        report_content += "## Steps\n\n"
+    sink = _ZipStreamSink()
+    # Default to STORED; each entry picks its compression explicitly
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zip_file:
+        # 1. Report Summary (Markdown), collected as fragments and joined once
+        report_parts: List[str] = [
+            f"# Test Report - {task_id}\n\n",
+            f"Generated: {datetime.now().isoformat()}\n\n",
+            "## Steps\n\n",
+        ]
+        append = report_parts.append
         
         for step in steps:
-            # Handle both object and dict (depending on if loaded from active or storage)
-            s_dict = step.model_dump() if hasattr(step, "model_dump") else step
+            # Handle both object and dict (depending on if loaded from active or storage).
+            # Dump once per step, and only the fields the report uses.
+            s_dict = step.model_dump(include=_REPORT_STEP_FIELDS) if hasattr(step, "model_dump") else step
             
+            step_num = s_dict.get("step_number")
             timestamp = s_dict.get("timestamp", "")
             action = s_dict.get("action_type", "unknown")
             args = s_dict.get("args", {})
             reasoning = s_dict.get("reasoning", "")
             
-            report_content += f"### Step {s_dict.get('step_number')}\n"
-            report_content += f"**Time**: {timestamp}\n"
-            report_content += f"**Action**: `{action}`\n"
-            report_content += f"**Args**: `{json.dumps(args)}`\n"
+            append(f"### Step {step_num}\n")
+            append(f"**Time**: {timestamp}\n")
+            append(f"**Action**: `{action}`\n")
+            append(f"**Args**: `{json.dumps(args)}`\n")
             if reasoning:
-                report_content += f"**Reasoning**: {reasoning}\n"
-            report_content += "\n---\n\n"
+                append(f"**Reasoning**: {reasoning}\n")
+            append("\n---\n\n")
             
-            # 2. Add Screenshot
-            # Screenshots are stored in data/screenshots/{task_id}_step_{num}.png
-            # We access them via storage path
-            # But the step object has `screenshot_path` that is absolute.
-            # We need to make it relative for the zip or just find it.
+            # 2. Screenshot, stored as data/screenshots/{task_id}_step_{num}.png.
+            # PNGs are already compressed, so they are stored rather than deflated.
+            filename = f"{prefix}{step_num}.png"
             
-            # Try to find the screenshot file
-            from storage import SCREENSHOTS_DIR
-            step_num = s_dict.get("step_number")
-            filename = f"{task_id}_step_{step_num}.png"
-            file_path = SCREENSHOTS_DIR / filename
-            
-            if file_path.exists():
-                zip_file.write(file_path, arcname=f"images/{filename}")
+            if filename in available:
+                file_path = SCREENSHOTS_DIR / filename
+                zip_info = zipfile.ZipInfo.from_file(file_path, arcname=f"images/{filename}")
+                zip_info.compress_type = zipfile.ZIP_STORED
+                with open(file_path, "rb") as src, zip_file.open(zip_info, "w") as dst:
+                    while chunk := src.read(REPORT_ZIP_CHUNK_SIZE):
+                        dst.write(chunk)
+                        yield sink.drain()
         
-        zip_file.writestr("report.md", report_content)
+        # Text compresses well even at the fastest level
+        zip_file.writestr("report.md", "".join(report_parts), compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+    
+    yield sink.drain()
 
-    zip_buffer.seek(0)
+
+@app.get("/reports/{task_id}/download")
+async def download_report(task_id: str):
+    """Download a zip report for a task."""
+    logger.debug("report_download_requested", task_id=task_id, active_tasks=len(active_tasks))
+    
+    # Check active tasks first
+    task_data = active_tasks.get(task_id)
+    steps = []
     
+    if task_data:
+        steps = task_data.get("steps", [])
+        logger.debug("report_steps_found", task_id=task_id, source="active_tasks", steps=len(steps))
+    else:
+        # Check if saved workflow exists (blocking file read)
+        workflow = await asyncio.to_thread(load_workflow, task_id)
+        if workflow:
+            steps = workflow.steps
+            logger.debug("report_steps_found", task_id=task_id, source="saved_workflow", steps=len(steps))
+    
+    if not task_data and not steps:
+        logger.debug("report_task_not_found", task_id=task_id)
+        raise HTTPException(status_code=404, detail=f"Task report not found: {task_id}")
+    
+    # Stream the zip as it is built - no full in-memory copy of the screenshots
     return StreamingResponse(
-        zip_buffer,
+        _iter_report_zip(task_id, list(steps)),
         media_type="application/zip",
         headers={"Content-Disposition": f"attachment; filename=report_{task_id}.zip"}
     )
@@ -2053,6 +2232,20 @@ async def validate_test_plan_endpoint(request: TestPlanValidateRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# The sample response never changes, so it is built once at import
+_SAMPLE_TEST_PLAN_RESPONSE = {
+    "sample": TestPlanParser.create_sample_test_plan(),
+    "supported_actions": [action.value for action in SemanticActionType],
+    "notes": {
+        "expected_visual": "REQUIRED for every step - describes what should be visible after the action",
+        "target_description": "Visual description of the element to interact with (for input, click, select)",
+        "target": "URL for navigate actions",
+        "value": "Text to enter for input/select actions",
+        "forbidden_fields": ["x", "y", "coordinates", "selector", "css_selector", "xpath"]
+    }
+}
+
+
 @app.get("/test-plans/sample")
 async def get_sample_test_plan():
     """
@@ -2061,18 +2254,7 @@ async def get_sample_test_plan():
     Returns a complete example test plan that demonstrates
     the correct format for semantic QA execution.
     """
-    parser = TestPlanParser()
-    return {
-        "sample": parser.create_sample_test_plan(),
-        "supported_actions": [action.value for action in SemanticActionType],
-        "notes": {
-            "expected_visual": "REQUIRED for every step - describes what should be visible after the action",
-            "target_description": "Visual description of the element to interact with (for input, click, select)",
-            "target": "URL for navigate actions",
-            "value": "Text to enter for input/select actions",
-            "forbidden_fields": ["x", "y", "coordinates", "selector", "css_selector", "xpath"]
-        }
-    }
+    return _SAMPLE_TEST_PLAN_RESPONSE
 
 
 @app.post("/test-plans/execute")
@@ -2095,8 +2277,8 @@ async def execute_test_plan_endpoint(
     Returns complete execution results with pass/fail status for each step.
     """
     try:
-        # Create browser and agent
-        browser = BrowserController()
+        # Borrow a pooled browser; the agent doesn't own it, so close() leaves it running
+        browser = _acquire_browser()
         agent = create_semantic_qa_agent(browser=browser)
 
         try:
@@ -2108,14 +2290,14 @@ async def execute_test_plan_endpoint(
                 max_retries_per_step=request.max_retries_per_step
             )
 
-            return result.model_dump()
+            return result.model_dump(exclude_none=True)
 
         finally:
             await agent.close()
+            await _release_browser(browser)
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("test_plan_execute_failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2132,11 +2314,11 @@ async def execute_single_step_endpoint(
     - Re-running failed steps
     - Step-by-step debugging
 
-    The browser session is created fresh for each call.
-    For persistent sessions, use the WebSocket endpoint.
+    Each call gets a clean browser session (pooled browsers are reset
+    between requests). For persistent sessions, use the WebSocket endpoint.
     """
     try:
-        browser = BrowserController()
+        browser = _acquire_browser()
         agent = create_semantic_qa_agent(browser=browser)
 
         try:
@@ -2146,14 +2328,14 @@ async def execute_single_step_endpoint(
                 max_retries=request.max_retries
             )
 
-            return result.model_dump()
+            return result.model_dump(exclude_none=True)
 
         finally:
             await agent.close()
+            await _release_browser(browser)
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("test_plan_step_failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2189,240 +2371,282 @@ async def websocket_test_plan_endpoint(websocket: WebSocket):
     browser: Optional[BrowserController] = None
     agent: Optional[SemanticQAAgent] = None
     execution_task: Optional[asyncio.Task] = None
-    session_metrics = SessionMetrics(session_id=str(uuid.uuid4()))
+    session_metrics = SessionMetrics(session_id=uuid.uuid4().hex)
+    # Set on the first failed send; later frames are dropped without serializing
+    closed = False
+    # Step statuses already sent for the current run. execution_status frames
+    # carry only the entries that changed; the UI merges them into its map.
+    sent_steps_status: Dict[int, Any] = {}
+
+    async def send_frame(text: str):
+        """Send a serialized JSON frame."""
+        nonlocal closed
+        if closed:
+            return
+        try:
+            await websocket.send_text(text)
+            session_metrics.record_message_sent()
+        except Exception as e:
+            closed = True
+            logger.warning("websocket_send_error", error=str(e))
 
     async def send_json(data: dict):
         """Helper to send JSON message."""
+        if closed:
+            return
         try:
-            await websocket.send_text(json.dumps(data))
-            session_metrics.record_message_sent()
-        except Exception as e:
+            text = _dumps_frame(data)
+        except TypeError as e:
             logger.warning("websocket_send_error", error=str(e))
+            return
+        await send_frame(text)
 
     async def on_step_status(step_id: int, status: StepStatus, message: str):
         """Callback for step status updates."""
+        if closed:
+            return
         await send_json({
             "type": "step_status",
             "step_id": step_id,
-            "status": status.value if hasattr(status, 'value') else status,
+            "status": _enum_value(status),
             "message": message
         })
 
     async def on_execution_status(status: TestPlanExecutionStatus):
         """Callback for overall execution status."""
+        if closed:
+            return
+        changed = {}
+        for step_id, step_status in status.steps_status.items():
+            value = _enum_value(step_status)
+            if sent_steps_status.get(step_id) != value:
+                changed[step_id] = value
+        sent_steps_status.update(changed)
         await send_json({
             "type": "execution_status",
             "test_case_id": status.test_case_id,
             "current_step_id": status.current_step_id,
-            "current_step_status": status.current_step_status.value if hasattr(status.current_step_status, 'value') else status.current_step_status,
+            "current_step_status": _enum_value(status.current_step_status),
             "progress": status.overall_progress,
-            "steps_status": {k: (v.value if hasattr(v, 'value') else v) for k, v in status.steps_status.items()},
+            "steps_status": changed,
             "message": status.message
         })
 
     async def on_screenshot(step_id: int, screenshot_b64: str):
         """Callback to send screenshots with step_id."""
-        await send_json({
-            "type": "screenshot",
-            "step_id": step_id,
-            "data": screenshot_b64
-        })
+        if closed:
+            return
+        await send_frame(_screenshot_frame(screenshot_b64, step_id))
 
     try:
         while True:
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=0.5)
-                message = json.loads(data)
-                msg_type = message.get("type")
-                session_metrics.record_message_received()
-
-                if msg_type == "execute":
-                    # Execute a complete test plan
-                    test_plan = message.get("test_plan")
-                    options = message.get("options", {})
-
-                    if not test_plan:
-                        await send_json({"type": "error", "message": "test_plan is required"})
-                        continue
-
-                    # Cancel any running execution
-                    if execution_task and not execution_task.done():
-                        execution_task.cancel()
-                        try:
-                            await execution_task
-                        except asyncio.CancelledError:
-                            pass
+            data = await websocket.receive_text()
+            message = json.loads(data)
+            msg_type = message.get("type")
+            session_metrics.record_message_received()
+
+            if msg_type == "execute":
+                # Execute a complete test plan
+                test_plan = message.get("test_plan")
+                options = message.get("options", {})
+
+                if not test_plan:
+                    await send_json({"type": "error", "message": "test_plan is required"})
+                    continue
+
+                # Cancel any running execution
+                if execution_task and not execution_task.done():
+                    execution_task.cancel()
+                    try:
+                        await execution_task
+                    except asyncio.CancelledError:
+                        pass
+
+                # New run: the UI resets its step statuses, so send them all again
+                sent_steps_status.clear()
+
+                # Create browser if needed
+                if browser is None:
+                    browser = BrowserController()
+
+                # Create agent with callbacks
+                agent = SemanticQAAgent(
+                    browser=browser,
+                    on_step_status=on_step_status,
+                    on_execution_status=on_execution_status,
+                    on_screenshot=on_screenshot,
+                    session_metrics=session_metrics
+                )
 
-                    # Create browser if needed
-                    if browser is None:
-                        browser = BrowserController()
+                async def run_execution():
+                    try:
+                        result = await agent.execute_test_plan(
+                            test_plan,
+                            start_from_step=options.get("start_from_step", 1),
+                            stop_on_failure=options.get("stop_on_failure", True),
+                            max_retries_per_step=options.get("max_retries_per_step", 3)
+                        )
 
-                    # Create agent with callbacks
-                    agent = SemanticQAAgent(
-                        browser=browser,
-                        on_step_status=on_step_status,
-                        on_execution_status=on_execution_status,
-                        on_screenshot=on_screenshot,
-                        session_metrics=session_metrics
-                    )
+                        await send_frame(_completed_result_frame(result))
 
-                    async def run_execution():
-                        try:
-                            result = await agent.execute_test_plan(
-                                test_plan,
-                                start_from_step=options.get("start_from_step", 1),
-                                stop_on_failure=options.get("stop_on_failure", True),
-                                max_retries_per_step=options.get("max_retries_per_step", 3)
-                            )
+                    except asyncio.CancelledError:
+                        await send_json({
+                            "type": "status",
+                            "status": "stopped",
+                            "message": "Execution cancelled"
+                        })
+                    except Exception as e:
+                        logger.exception("test_plan_execution_failed")
+                        await send_json({
+                            "type": "error",
+                            "message": str(e)
+                        })
 
-                            await send_json({
-                                "type": "completed",
-                                "result": result.model_dump()
-                            })
+                execution_task = asyncio.create_task(run_execution())
 
-                        except asyncio.CancelledError:
-                            await send_json({
-                                "type": "status",
-                                "status": "stopped",
-                                "message": "Execution cancelled"
-                            })
-                        except Exception as e:
-                            import traceback
-                            traceback.print_exc()
-                            await send_json({
-                                "type": "error",
-                                "message": str(e)
-                            })
+            elif msg_type == "execute_step":
+                # Execute a single step
+                step = message.get("step")
 
-                    execution_task = asyncio.create_task(run_execution())
+                if not step:
+                    await send_json({"type": "error", "message": "step is required"})
+                    continue
 
-                elif msg_type == "execute_step":
-                    # Execute a single step
-                    step = message.get("step")
+                # Cancel any running execution; steps share the browser
+                if execution_task and not execution_task.done():
+                    execution_task.cancel()
+                    try:
+                        await execution_task
+                    except asyncio.CancelledError:
+                        pass
 
-                    if not step:
-                        await send_json({"type": "error", "message": "step is required"})
-                        continue
+                # Create browser if needed
+                if browser is None:
+                    browser = BrowserController()
+                    await browser.start()
 
-                    # Create browser if needed
-                    if browser is None:
-                        browser = BrowserController()
-                        await browser.start()
-
-                    # Create agent if needed
-                    if agent is None:
-                        agent = SemanticQAAgent(
-                            browser=browser,
-                            on_step_status=on_step_status,
-                            on_screenshot=on_screenshot,
-                            session_metrics=session_metrics
-                        )
+                # Create agent if needed
+                if agent is None:
+                    agent = SemanticQAAgent(
+                        browser=browser,
+                        on_step_status=on_step_status,
+                        on_screenshot=on_screenshot,
+                        session_metrics=session_metrics
+                    )
 
+                # Run in the background so stop/ping/get_screenshot are still
+                # serviced while the step executes
+                async def run_single_step(step: dict, task_id: Optional[str], max_retries: int):
                     try:
                         result = await agent.execute_single_step(
                             step,
-                            task_id=message.get("task_id"),
-                            max_retries=message.get("max_retries", 3)
+                            task_id=task_id,
+                            max_retries=max_retries
                         )
 
                         await send_json({
                             "type": "step_result",
                             "step_id": result.step_id,
-                            "status": result.status.value if hasattr(result.status, 'value') else result.status,
-                            "result": result.model_dump()
+                            "status": _enum_value(result.status),
+                            "result": result.model_dump(exclude_none=True)
                         })
 
+                    except asyncio.CancelledError:
+                        await send_json({
+                            "type": "status",
+                            "status": "stopped",
+                            "message": "Step cancelled"
+                        })
                     except Exception as e:
                         await send_json({
                             "type": "error",
                             "message": str(e)
                         })
 
-                elif msg_type == "resume":
-                    # Resume execution from a specific step
-                    test_plan = message.get("test_plan")
-                    from_step = message.get("from_step", 1)
-
-                    if not test_plan:
-                        await send_json({"type": "error", "message": "test_plan is required"})
-                        continue
-
-                    if agent is None:
-                        if browser is None:
-                            browser = BrowserController()
-                        agent = SemanticQAAgent(
-                            browser=browser,
-                            on_step_status=on_step_status,
-                            on_execution_status=on_execution_status,
-                            on_screenshot=on_screenshot,
-                            session_metrics=session_metrics
-                        )
+                execution_task = asyncio.create_task(run_single_step(
+                    step,
+                    message.get("task_id"),
+                    message.get("max_retries", 3)
+                ))
 
-                    async def run_resume():
-                        try:
-                            result = await agent.resume_from_step(
-                                test_plan,
-                                step_id=from_step
-                            )
+            elif msg_type == "resume":
+                # Resume execution from a specific step
+                test_plan = message.get("test_plan")
+                from_step = message.get("from_step", 1)
 
-                            await send_json({
-                                "type": "completed",
-                                "result": result.model_dump()
-                            })
-
-                        except Exception as e:
-                            await send_json({
-                                "type": "error",
-                                "message": str(e)
-                            })
-
-                    execution_task = asyncio.create_task(run_resume())
+                if not test_plan:
+                    await send_json({"type": "error", "message": "test_plan is required"})
+                    continue
 
-                elif msg_type == "stop":
-                    # Stop execution
-                    if agent:
-                        agent.stop()
-                    if execution_task and not execution_task.done():
-                        execution_task.cancel()
+                sent_steps_status.clear()
 
-                    await send_json({
-                        "type": "status",
-                        "status": "stopping",
-                        "message": "Stop requested"
-                    })
+                if agent is None:
+                    if browser is None:
+                        browser = BrowserController()
+                    agent = SemanticQAAgent(
+                        browser=browser,
+                        on_step_status=on_step_status,
+                        on_execution_status=on_execution_status,
+                        on_screenshot=on_screenshot,
+                        session_metrics=session_metrics
+                    )
 
-                elif msg_type == "close_browser":
-                    # Close browser
-                    if browser:
-                        await browser.stop()
-                        browser = None
-                        agent = None
+                async def run_resume():
+                    try:
+                        result = await agent.resume_from_step(
+                            test_plan,
+                            step_id=from_step
+                        )
 
-                    await send_json({
-                        "type": "status",
-                        "status": "idle",
-                        "message": "Browser closed"
-                    })
+                        await send_frame(_completed_result_frame(result))
 
-                elif msg_type == "get_screenshot":
-                    # Get current screenshot
-                    if browser and browser.is_started:
-                        screenshot = await browser.get_screenshot_base64()
-                        await send_json({
-                            "type": "screenshot",
-                            "data": screenshot
-                        })
-                    else:
+                    except Exception as e:
                         await send_json({
                             "type": "error",
-                            "message": "Browser not started"
+                            "message": str(e)
                         })
 
-                elif msg_type == "ping":
-                    await send_json({"type": "pong"})
+                execution_task = asyncio.create_task(run_resume())
+
+            elif msg_type == "stop":
+                # Stop execution
+                if agent:
+                    agent.stop()
+                if execution_task and not execution_task.done():
+                    execution_task.cancel()
+
+                await send_json({
+                    "type": "status",
+                    "status": "stopping",
+                    "message": "Stop requested"
+                })
+
+            elif msg_type == "close_browser":
+                # Close browser
+                if browser:
+                    await browser.stop()
+                    browser = None
+                    agent = None
+
+                await send_json({
+                    "type": "status",
+                    "status": "idle",
+                    "message": "Browser closed"
+                })
+
+            elif msg_type == "get_screenshot":
+                # Get current screenshot
+                if browser and browser.is_started:
+                    screenshot = await browser.get_screenshot_base64()
+                    await send_frame(_screenshot_frame(screenshot))
+                else:
+                    await send_json({
+                        "type": "error",
+                        "message": "Browser not started"
+                    })
 
-            except asyncio.TimeoutError:
-                continue
+            elif msg_type == "ping":
+                await send_json({"type": "pong"})
 
     except WebSocketDisconnect:
         logger.info("test_plan_websocket_disconnected")
@@ -2441,5 +2665,6 @@ async def websocket_test_plan_endpoint(websocket: WebSocket):
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Running this module directly would make every spawned hammer index
+    # worker re-import the whole app as __mp_main__; server.py avoids that.
+    raise SystemExit("Start the backend with: python server.py")
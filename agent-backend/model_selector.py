@@ -10,7 +10,11 @@ Cost tiers (relative):
 - gemini-2.5-computer-use: $$$$ (browser control only)
 """
 from enum import Enum
-from typing import Optional
+from typing import ClassVar, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
 
 
 class TaskType(str, Enum):
@@ -62,6 +66,11 @@ class ModelSelector:
         }
     }
     
+    # Model name -> relative cost, for constant-time lookups in estimate_savings
+    _NAME_TO_COST: ClassVar[Dict[str, float]] = {
+        config["name"]: config["cost"] for config in MODELS.values()
+    }
+    
     # Task to model mapping (cheapest viable option)
     TASK_MODEL_MAP = {
         TaskType.SUMMARIZE: "lite",      # Simple text task
@@ -99,7 +108,7 @@ class ModelSelector:
         model_info = cls.MODELS[model_tier]
         model_name = model_info["name"]
         
-        print(f"[MODEL] Selected '{model_name}' for {task_type.value} task (cost tier: {model_tier})")
+        logger.debug("model_selected", model=model_name, tier=model_tier, task=task_type.value)
         return model_name
     
     @classmethod
@@ -118,14 +127,8 @@ class ModelSelector:
         
         Returns a dict with savings percentage and details.
         """
-        original_cost = None
-        optimized_cost = None
-        
-        for tier, config in cls.MODELS.items():
-            if config["name"] == original_model:
-                original_cost = config["cost"]
-            if config["name"] == optimized_model:
-                optimized_cost = config["cost"]
+        original_cost = cls._NAME_TO_COST.get(original_model)
+        optimized_cost = cls._NAME_TO_COST.get(optimized_model)
         
         if original_cost and optimized_cost:
             savings_pct = ((original_cost - optimized_cost) / original_cost) * 100
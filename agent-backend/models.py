@@ -1,6 +1,9 @@
 """Pydantic models for API request/response and internal data structures."""
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+import time
+from datetime import datetime
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from typing import ClassVar, Optional, List, Dict, Any, Tuple
 from enum import Enum
 
 
@@ -56,6 +59,9 @@ class SessionContext(BaseModel):
     This is the MEMORY that allows the agent to remember things
     like copied IDs, previous task results, and conversational context.
     """
+    MAX_TASK_HISTORY: ClassVar[int] = 20  # Prompts only show the last 5 tasks
+    MAX_SESSION_VALUES: ClassVar[int] = 50  # Cap for copied values and user instructions
+    
     session_id: str
     clipboard: Optional[str] = None  # Last copied text (e.g., company ID)
     last_copied_values: List[str] = []  # History of copied values in order
@@ -63,7 +69,52 @@ class SessionContext(BaseModel):
     current_url: Optional[str] = None  # Where the browser currently is
     user_instructions: List[str] = []  # All user commands in this session for context
     important_notes: Dict[str, str] = {}  # Key-value pairs for important extracted info
-    created_at: Optional[str] = None
+    tasks_completed: int = 0  # Total tasks, including those trimmed from task_history
+    hammer_record_counts: List[int] = []  # Records indexed per Hammer load, in order
+    created_at_ns: int = Field(default_factory=time.time_ns)  # Epoch ns, formatted on demand
+    # Parsed company registry (static_data) and its time.monotonic() load time
+    companies_cache: Optional[List[Dict[str, Any]]] = Field(default=None, exclude=True)
+    companies_cache_ts: float = Field(default=0.0, exclude=True)
+    
+    @computed_field
+    @property
+    def created_at(self) -> str:
+        """ISO-8601 creation time, formatted only when read or serialized."""
+        return datetime.fromtimestamp(self.created_at_ns / 1e9).isoformat()
+    
+    def record_task(self, summary: Dict[str, Any]) -> None:
+        """Append a task summary, keeping only the most recent MAX_TASK_HISTORY."""
+        self.task_history.append(summary)
+        self.tasks_completed += 1
+        if len(self.task_history) > self.MAX_TASK_HISTORY:
+            del self.task_history[:-self.MAX_TASK_HISTORY]
+    
+    def remember_value(self, value: str) -> None:
+        """Set the clipboard and append to the copied-values history (bounded)."""
+        self.clipboard = value
+        self.last_copied_values.append(value)
+        if len(self.last_copied_values) > self.MAX_SESSION_VALUES:
+            del self.last_copied_values[:-self.MAX_SESSION_VALUES]
+    
+    def add_instruction(self, instruction: str) -> None:
+        """Append a user command to the session's instruction history (bounded)."""
+        self.user_instructions.append(instruction)
+        if len(self.user_instructions) > self.MAX_SESSION_VALUES:
+            del self.user_instructions[:-self.MAX_SESSION_VALUES]
+    
+    def record_hammer_index(
+        self,
+        records_count: int,
+        company: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> None:
+        """Record a Hammer load: typed record count plus the notes shown in prompts."""
+        self.hammer_record_counts.append(int(records_count))
+        self.important_notes["hammer_records"] = str(records_count)
+        if company is not None:
+            self.important_notes["hammer_company"] = company
+        if filename is not None:
+            self.important_notes["hammer_file"] = filename
 
 
 class TaskRequest(BaseModel):
@@ -157,8 +208,7 @@ class TestStep(BaseModel):
     expected_visual: str                   # REQUIRED: Visual verification description
     timeout_seconds: int = 30              # Max time to wait for action
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class TestPlan(BaseModel):
@@ -173,12 +223,25 @@ class TestPlan(BaseModel):
     tags: List[str] = []
     metadata: Dict[str, Any] = {}
 
-    def get_step(self, step_id: int) -> Optional[TestStep]:
-        """Get a step by its ID."""
+    @cached_property
+    def _step_index(self) -> Tuple[List[TestStep], Dict[int, TestStep]]:
+        """The steps list and its step_id -> step index, built on first lookup."""
+        index: Dict[int, TestStep] = {}
         for step in self.steps:
-            if step.step_id == step_id:
-                return step
-        return None
+            # First occurrence wins, as with a linear scan
+            index.setdefault(step.step_id, step)
+        return self.steps, index
+
+    def get_step(self, step_id: int) -> Optional[TestStep]:
+        """Get a step by its ID.
+
+        The index is rebuilt whenever steps has been replaced by a new list.
+        """
+        source, index = self._step_index
+        if source is not self.steps:
+            del self._step_index
+            source, index = self._step_index
+        return index.get(step_id)
 
 
 class StepEvidence(BaseModel):
@@ -205,8 +268,7 @@ class StepExecutionResult(BaseModel):
     execution_time_ms: int = 0
     timestamp: Optional[str] = None
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class TestPlanExecutionResult(BaseModel):
@@ -223,8 +285,7 @@ class TestPlanExecutionResult(BaseModel):
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class TestPlanExecutionRequest(BaseModel):
@@ -245,6 +306,5 @@ class TestPlanExecutionStatus(BaseModel):
     steps_status: Dict[int, StepStatus]   # step_id -> status mapping
     message: Optional[str] = None
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
@@ -8,12 +8,14 @@ Provides:
 """
 import logging
 import sys
-import uuid
 from contextvars import ContextVar
-from functools import wraps
-from typing import Any, Callable, Optional
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+from secrets import token_hex
+from typing import Callable, Optional
 import time
 
+import orjson
 import structlog
 from prometheus_client import Counter, Histogram, Gauge
 
@@ -28,6 +30,21 @@ task_id_var: ContextVar[str] = ContextVar("task_id", default="")
 # =============================================================================
 # SESSION METRICS - Per-session tracking for real-time UI display
 # =============================================================================
+# Guardrail results reported before any are recorded. Shared and never mutated:
+# SessionMetrics copies it on the first record_guardrail_result().
+_DEFAULT_GUARDRAIL_RESULTS = {
+    "step_count_expected": None,
+    "step_count_actual": 0,
+    "extra_steps": [],
+    "drift_detected": False,
+    "adaptive_recovery": False,
+    "static_data_loaded": False,
+    "static_data_used": False,
+    "context_pollution": False,
+    "validators": {},
+}
+
+
 class SessionMetrics:
     """
     Per-session metrics that can be sent to frontend in real-time.
@@ -36,6 +53,29 @@ class SessionMetrics:
     and reset when the session ends. They are sent via WebSocket to the Report Modal.
     """
     
+    # One instance per WebSocket session; slots drop the per-instance __dict__
+    __slots__ = (
+        "session_id",
+        "started_at",
+        "websocket_messages_sent",
+        "websocket_messages_received",
+        "agent_tasks_started",
+        "agent_tasks_completed",
+        "agent_tasks_failed",
+        "agent_turns",
+        "gemini_api_calls",
+        "browser_actions",
+        "pinecone_queries",
+        "total_agent_turn_duration",
+        "total_gemini_api_duration",
+        "total_browser_action_duration",
+        "total_input_tokens",
+        "total_output_tokens",
+        "total_estimated_cost",
+        "model_usage",
+        "guardrail_results",
+    )
+    
     def __init__(self, session_id: str):
         self.session_id = session_id
         self.started_at = time.time()
@@ -62,18 +102,8 @@ class SessionMetrics:
         self.total_estimated_cost = 0.0
         self.model_usage = {}  # {model_name: {input: X, output: Y, cost: Z}}
         
-        # Guardrail results (populated after task completion)
-        self.guardrail_results = {
-            "step_count_expected": None,
-            "step_count_actual": 0,
-            "extra_steps": [],
-            "drift_detected": False,
-            "adaptive_recovery": False,
-            "static_data_loaded": False,
-            "static_data_used": False,
-            "context_pollution": False,
-            "validators": {},
-        }
+        # Guardrail results (populated after task completion; None until then)
+        self.guardrail_results: Optional[dict] = None
     
     def record_message_sent(self):
         """Record a WebSocket message sent."""
@@ -133,11 +163,20 @@ class SessionMetrics:
         Args:
             summary: Dict from GuardrailService.get_summary()
         """
+        if self.guardrail_results is None:
+            self.guardrail_results = {
+                **_DEFAULT_GUARDRAIL_RESULTS,
+                "extra_steps": [],
+                "validators": {},
+            }
         self.guardrail_results.update(summary)
     
     def to_dict(self) -> dict:
         """Convert to dictionary for WebSocket transmission."""
         elapsed = time.time() - self.started_at
+        turns = self.agent_turns
+        gemini_calls = self.gemini_api_calls
+        gemini_duration = self.total_gemini_api_duration
         return {
             "session_id": self.session_id,
             "elapsed_seconds": round(elapsed, 1),
@@ -149,17 +188,17 @@ class SessionMetrics:
                 "tasks_started": self.agent_tasks_started,
                 "tasks_completed": self.agent_tasks_completed,
                 "tasks_failed": self.agent_tasks_failed,
-                "turns": self.agent_turns,
+                "turns": turns,
                 "avg_turn_duration_seconds": round(
-                    self.total_agent_turn_duration / max(1, self.agent_turns), 2
-                ),
+                    self.total_agent_turn_duration / turns, 2
+                ) if turns else 0.0,
             },
             "gemini_api": {
-                "calls": self.gemini_api_calls,
-                "total_duration_seconds": round(self.total_gemini_api_duration, 2),
+                "calls": gemini_calls,
+                "total_duration_seconds": round(gemini_duration, 2),
                 "avg_duration_seconds": round(
-                    self.total_gemini_api_duration / max(1, self.gemini_api_calls), 2
-                ),
+                    gemini_duration / gemini_calls, 2
+                ) if gemini_calls else 0.0,
             },
             "browser": {
                 "actions": self.browser_actions,
@@ -174,13 +213,16 @@ class SessionMetrics:
                 "total_cost_usd": round(self.total_estimated_cost, 4),
                 "model_usage": self.model_usage,
             },
-            "guardrails": self.guardrail_results,
+            "guardrails": (
+                self.guardrail_results if self.guardrail_results is not None
+                else _DEFAULT_GUARDRAIL_RESULTS
+            ),
         }
 
 
 def generate_trace_id() -> str:
-    """Generate a new trace ID."""
-    return uuid.uuid4().hex[:16]
+    """Generate a new trace ID (16 hex chars)."""
+    return token_hex(8)
 
 
 def bind_context(
@@ -216,7 +258,13 @@ def add_context_processor(
     logger: logging.Logger, method_name: str, event_dict: dict
 ) -> dict:
     """Add context variables to every log entry."""
-    event_dict.update(get_context())
+    # Same as merging get_context(), without building a dict per log line
+    if trace_id := trace_id_var.get():
+        event_dict["trace_id"] = trace_id
+    if session_id := session_id_var.get():
+        event_dict["session_id"] = session_id
+    if task_id := task_id_var.get():
+        event_dict["task_id"] = task_id
     return event_dict
 
 
@@ -237,16 +285,22 @@ def configure_logging(json_format: bool = True, log_level: str = "INFO") -> None
     ]
     
     if json_format:
-        # Production: JSON format for log aggregation
+        # Production: JSON format for log aggregation. orjson renders bytes,
+        # which BytesLogger writes to stdout without re-encoding. Non-str keys
+        # (e.g. step_id -> status maps) are allowed, as stdlib json did.
         processors = shared_processors + [
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(
+                serializer=orjson.dumps, option=orjson.OPT_NON_STR_KEYS
+            ),
         ]
+        logger_factory = structlog.BytesLoggerFactory()
     else:
         # Development: Colored console output
         processors = shared_processors + [
             structlog.dev.ConsoleRenderer(colors=True),
         ]
+        logger_factory = structlog.PrintLoggerFactory()
     
     structlog.configure(
         processors=processors,
@@ -254,7 +308,7 @@ def configure_logging(json_format: bool = True, log_level: str = "INFO") -> None
             getattr(logging, log_level.upper(), logging.INFO)
         ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
     
@@ -288,12 +342,24 @@ WEBSOCKET_MESSAGES = Counter(
     ["direction", "message_type"],  # direction: sent/received, message_type: start/stop/step/etc
 )
 
+
+@lru_cache(maxsize=None)
+def websocket_messages_sent(message_type: str) -> Counter:
+    """Sent-messages counter child for a frame type, resolved once per type."""
+    return WEBSOCKET_MESSAGES.labels(direction="sent", message_type=message_type)
+
+
 # Agent Metrics
 AGENT_TASKS = Counter(
     "agent_tasks_total",
     "Total agent tasks started",
     ["status"],  # status: started/completed/failed/cancelled
 )
+# Children for the fixed status set, resolved once (and exported from zero)
+AGENT_TASKS_BY_STATUS = {
+    status: AGENT_TASKS.labels(status=status)
+    for status in ("started", "completed", "failed", "cancelled")
+}
 AGENT_TURN_DURATION = Histogram(
     "agent_turn_duration_seconds",
     "Duration of each agent turn",
@@ -365,18 +431,19 @@ def timed(
     labels: Optional[dict] = None,
 ):
     """Decorator to time function execution and record to Prometheus histogram."""
+    # Labels are fixed at decoration time, so resolve the child metric once
+    observe = metric.labels(**labels).observe if labels else metric.observe
+    
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            start = time.perf_counter()
-            try:
-                return await func(*args, **kwargs)
-            finally:
-                duration = time.perf_counter() - start
-                if labels:
-                    metric.labels(**labels).observe(duration)
-                else:
-                    metric.observe(duration)
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(time.perf_counter() - start)
+            return async_wrapper
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -384,24 +451,11 @@ def timed(
             try:
                 return func(*args, **kwargs)
             finally:
-                duration = time.perf_counter() - start
-                if labels:
-                    metric.labels(**labels).observe(duration)
-                else:
-                    metric.observe(duration)
-        
-        if asyncio_iscoroutinefunction(func):
-            return async_wrapper
+                observe(time.perf_counter() - start)
         return sync_wrapper
     return decorator
 
 
-def asyncio_iscoroutinefunction(func: Any) -> bool:
-    """Check if function is an async function."""
-    import asyncio
-    return asyncio.iscoroutinefunction(func)
-
-
 # =============================================================================
 # INITIALIZATION
 # =============================================================================
@@ -1,13 +1,22 @@
 """Pinecone service for managing multiple indexes with different retention policies."""
 import os
 import hashlib
+import heapq
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
+import orjson
+import structlog
 from pinecone import Pinecone, ServerlessSpec
 
-from config import MRL_DIMENSION
+from cache_service import get_match_cache
+from config import MATCH_HIGH_CONFIDENCE, MRL_DIMENSION
+
+logger = structlog.get_logger(__name__)
 
 
 class IndexType(str, Enum):
@@ -30,6 +39,16 @@ RESETTABLE_INDEXES = [IndexType.HAMMER]
 # Indexes that persist forever (episodic memory)
 PERSISTENT_INDEXES = [IndexType.WORKFLOWS]
 
+# Indexes created on first use if missing (aliases of these resolve to them)
+ACTIVE_INDEXES = [IndexType.HAMMER, IndexType.WORKFLOWS]
+
+# Bulk upserts: vectors per request and requests in flight at once
+UPSERT_BATCH_SIZE = 100
+UPSERT_MAX_WORKERS = 8
+
+# Shared worker threads for fan-out calls (parallel upsert batches, stats)
+EXECUTOR_MAX_WORKERS = 16
+
 
 class PineconeService:
     """
@@ -56,37 +75,60 @@ class PineconeService:
         }
         self.dimension = MRL_DIMENSION  # Default to Gemini dimension from config
         
-        # Only create active indexes (not deprecated ones)
-        self._ensure_indexes_exist()
-
-    def _ensure_indexes_exist(self):
-        """Create active indexes if they don't exist (skip deprecated)."""
-        existing = self.pc.list_indexes().names()
+        # Index name -> pc.Index handle (aliased IndexTypes share one entry)
+        self._index_cache: Dict[str, Any] = {}
+        
+        # Long-lived pool so fan-out calls reuse warm threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="pinecone"
+        )
         
+        # Existence is checked lazily, the first time an index is used
+        self._existing_names: Optional[set] = None
+        self._ensure_lock = threading.Lock()
+
+    def _ensure_index_exists(self, index_type: IndexType):
+        """Create an active index if it doesn't exist (deprecated ones are skipped)."""
         # Only create active indexes, not deprecated ones (SUCCESS_CASES reuses steps-index)
-        active_indexes = [IndexType.HAMMER, IndexType.WORKFLOWS]
-        
-        for index_type in active_indexes:
-            if index_type.value not in existing:
-                dimension = self.dimensions.get(index_type, self.dimension)
-                print(f"Creating index: {index_type.value} (dim={dimension})")
-                try:
-                    self.pc.create_index(
-                        name=index_type.value,
-                        dimension=dimension,
-                        metric="cosine",
-                        spec=ServerlessSpec(
-                            cloud="aws",
-                            region=self.environment
-                        )
+        if index_type not in ACTIVE_INDEXES:
+            return
+        
+        with self._ensure_lock:
+            if self._existing_names is None:
+                self._existing_names = set(self.pc.list_indexes().names())
+            if index_type.value in self._existing_names:
+                return
+            
+            dimension = self.dimensions.get(index_type, self.dimension)
+            print(f"Creating index: {index_type.value} (dim={dimension})")
+            try:
+                self.pc.create_index(
+                    name=index_type.value,
+                    dimension=dimension,
+                    metric="cosine",
+                    spec=ServerlessSpec(
+                        cloud="aws",
+                        region=self.environment
                     )
-                except Exception as e:
-                    print(f"⚠️ Could not create index {index_type.value}: {e}")
-                    print(f"   If you hit plan limits, consider deleting unused indexes (jira-index, zendesk-index)")
+                )
+                self._existing_names.add(index_type.value)
+            except Exception as e:
+                print(f"⚠️ Could not create index {index_type.value}: {e}")
+                print(f"   If you hit plan limits, consider deleting unused indexes (jira-index, zendesk-index)")
 
     def get_index(self, index_type: IndexType):
-        """Get a Pinecone index by type."""
-        return self.pc.Index(index_type.value)
+        """Get a Pinecone index by type.
+        
+        Index handles are cached so every operation reuses the same
+        connection pool instead of opening new connections. Active indexes
+        are created on first access if missing.
+        """
+        index = self._index_cache.get(index_type.value)
+        if index is None:
+            self._ensure_index_exists(index_type)
+            # A racing thread may build a second handle; setdefault keeps one
+            index = self._index_cache.setdefault(index_type.value, self.pc.Index(index_type.value))
+        return index
 
     # ==================== RESETTABLE INDEXES (hammer, jira, zendesk) ====================
 
@@ -97,7 +139,7 @@ class PineconeService:
         """
         for index_type in RESETTABLE_INDEXES:
             self.clear_index(index_type)
-        print(f"Cleared indexes for new ticket: {ticket_id or 'unknown'}")
+        logger.info("indexes_cleared_for_ticket", ticket_id=ticket_id or "unknown")
 
     def clear_index(self, index_type: IndexType):
         """Clear all vectors from an index."""
@@ -106,29 +148,48 @@ class PineconeService:
         try:
             index.delete(delete_all=True)
         except Exception as e:
-            print(f"Error clearing {index_type.value}: {e}")
+            logger.warning("index_clear_failed", index=index_type.value, error=str(e))
 
     def upsert_to_index(
         self,
         index_type: IndexType,
-        vectors: List[Dict[str, Any]]
+        vectors: List[Dict[str, Any]],
+        batch_size: int = UPSERT_BATCH_SIZE,
+        max_workers: int = UPSERT_MAX_WORKERS
     ):
         """
         Upsert vectors to a specific index.
         
+        Large loads are split into batches that are sent in parallel threads,
+        so the network round-trips overlap instead of running back to back.
+        
         Args:
             index_type: Which index to upsert to
             vectors: List of dicts with 'id', 'values', 'metadata'
+            batch_size: Vectors per upsert request
+            max_workers: Upsert requests in flight at once
         """
         index = self.get_index(index_type)
         
         # Add timestamp to all metadata
+        indexed_at = datetime.now().isoformat()
         for v in vectors:
-            if 'metadata' not in v:
-                v['metadata'] = {}
-            v['metadata']['indexed_at'] = datetime.now().isoformat()
-        
-        index.upsert(vectors=vectors)
+            v.setdefault('metadata', {})['indexed_at'] = indexed_at
+        
+        if len(vectors) <= batch_size:
+            index.upsert(vectors=vectors)
+            return
+        
+        # Runs on the shared executor, but never more than max_workers at once
+        in_flight = set()
+        for i in range(0, len(vectors), batch_size):
+            if len(in_flight) >= max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(self._executor.submit(index.upsert, vectors=vectors[i:i + batch_size]))
+        for future in in_flight:
+            future.result()
 
     def query_index(
         self,
@@ -219,7 +280,7 @@ class PineconeService:
                 for r in results
             ]
         except Exception as e:
-            print(f"[HYBRID] Hammer hybrid search failed, falling back to dense: {e}")
+            logger.warning("hammer_hybrid_search_failed", error=str(e), fallback="dense")
             return self.query_hammer(query_text, top_k, use_hybrid=False)
     
     def get_hammer_stats(self) -> Dict:
@@ -245,9 +306,8 @@ class PineconeService:
         Args:
             client_id: Optional client ID for logging
         """
-        print(f"🧹 Clearing hammer-index for new client: {client_id or 'unknown'}")
         self.clear_index(IndexType.HAMMER)
-        print("   ✓ hammer-index cleared (dense + sparse vectors)")
+        logger.info("hammer_index_cleared", client_id=client_id or "unknown")
 
 
     # ==================== STEPS INDEX (persistent, intelligent) ====================
@@ -255,7 +315,9 @@ class PineconeService:
     def _generate_step_id(self, action_type: str, goal_description: str) -> str:
         """Generate a unique ID for a step based on action and goal."""
         content = f"{action_type}:{goal_description}"
-        return hashlib.md5(content.encode()).hexdigest()[:16]
+        # Kept on MD5 so existing step_group_ids keep matching new versions;
+        # not a security use, which also keeps FIPS builds from rejecting it
+        return hashlib.md5(content.encode(), usedforsecurity=False).hexdigest()[:16]
 
     def upsert_step(
         self,
@@ -282,8 +344,6 @@ class PineconeService:
             embedding: Vector embedding of the step
             efficiency_score: Not used, kept for backwards compatibility
         """
-        import json
-        
         step_id = self._generate_step_id(action_type, goal_description)
         version_id = f"{step_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         
@@ -327,11 +387,24 @@ class PineconeService:
         # CLEAN JSON METADATA - Pure JSON, no formatting
         # ============================================
         metadata = {
-            "urls_visited": json.dumps(urls_visited),
-            "actions": json.dumps(actions_performed),
-            "steps": json.dumps(steps_clean)[:10000],  # Truncate for Pinecone limits
+            "urls_visited": orjson.dumps(urls_visited).decode(),
+            # Action types may be str-Enum members, which orjson only takes as keys with this flag
+            "actions": orjson.dumps(actions_performed, option=orjson.OPT_NON_STR_KEYS).decode(),
+            "steps": orjson.dumps(steps_clean).decode()[:10000],  # Truncate for Pinecone limits
             "format": "json_v2",  # Flag to identify new format
+            # Typed top-level fields so queries can filter on them server-side
+            "action_type": action_type,
+            "goal_description": goal_description,
+            "step_group_id": step_id,
+            "step_count": len(steps),
         }
+        # Pinecone rejects null metadata values, so only set these when present
+        workflow_id = step_details.get("id")
+        if workflow_id:
+            metadata["workflow_id"] = workflow_id
+        workflow_name = step_details.get("name")
+        if workflow_name:
+            metadata["workflow_name"] = workflow_name
         
         index = self.get_index(IndexType.STEPS)
         
@@ -340,6 +413,8 @@ class PineconeService:
             "values": embedding,
             "metadata": metadata
         }])
+        # Cached goal -> workflow matches may now be outdated
+        get_match_cache().clear()
         
         return version_id
 
@@ -440,6 +515,9 @@ class PineconeService:
             }],
             namespace=namespace
         )
+        if index_name != "hammer-index":
+            # Cached goal -> workflow matches may now be outdated
+            get_match_cache().clear()
         
         print(f"[WORKFLOW] Indexed '{name}' to {index_name}/{namespace} (id: {version_id})")
         return version_id
@@ -450,7 +528,10 @@ class PineconeService:
         query_embedding: List[float],
         top_k: int = 5,
         prefer_recent: bool = True,
-        namespace: str = ""
+        namespace: str = "",
+        min_score: float = 0.0,
+        filter: Optional[Dict] = None,
+        overfetch_factor: Optional[int] = None
     ) -> List[Dict]:
         """
         Find steps similar to the query.
@@ -460,51 +541,71 @@ class PineconeService:
             top_k: Number of results
             prefer_recent: If True, sort by date (most recent first)
             namespace: Namespace to search in (e.g., 'test_execution_steps')
+            min_score: Drop matches scoring below this before building results
+            filter: Optional Pinecone metadata filter, applied server-side
+            overfetch_factor: Multiplier on top_k for the query; defaults to 2
+                when prefer_recent re-ranks the results, otherwise 1
         
         Returns:
             List of matching steps with metadata
         """
+        if overfetch_factor is None:
+            # Extra candidates only matter when re-ranking by recency; the
+            # score-ordered path would just truncate them again
+            overfetch_factor = 2 if prefer_recent else 1
+        
         matches = self.query_index(
             IndexType.STEPS,
             query_embedding,
-            top_k=top_k * 2,  # Get more to filter
+            top_k=top_k * overfetch_factor,
+            filter=filter,
             namespace=namespace
         )
         
-        # Parse results
-        results = []
-        for match in matches:
-            result = {
-                "id": match.id,
-                "score": match.score,
-                # OLD format fields (for legacy workflows)
-                "action_type": match.metadata.get("action_type"),
-                "goal_description": match.metadata.get("goal_description"),
-                "step_details": match.metadata.get("step_details"),
-                "workflow_name": match.metadata.get("workflow_name"),
-                "efficiency_score": match.metadata.get("efficiency_score", 1.0),
-                "indexed_at": match.metadata.get("indexed_at"),
-                "step_group_id": match.metadata.get("step_group_id"),
-                # OLD TEXT format fields (legacy human-readable)
-                "actions_performed": match.metadata.get("actions_performed"),
-                "system_logs": match.metadata.get("system_logs"),
-                # NEW JSON format fields (json_v2)
-                "urls_visited": match.metadata.get("urls_visited"),
-                "actions": match.metadata.get("actions"),
-                "steps": match.metadata.get("steps"),
-                "user_prompts": match.metadata.get("user_prompts"),
-                "format": match.metadata.get("format"),  # "json_v2" for new format
-            }
-            results.append(result)
+        # Pinecone cannot filter on score, so gate here
+        candidates = (match for match in matches if match.score >= min_score)
         
         if prefer_recent:
-            # Sort by date (most recent first), then by efficiency
-            results.sort(key=lambda x: (
-                x.get("indexed_at", ""),
-                -x.get("efficiency_score", 1.0)
-            ), reverse=True)
+            # Most recent first, then by efficiency; rank the raw matches so
+            # only the top_k survivors get turned into result dicts
+            kept = heapq.nlargest(
+                top_k,
+                candidates,
+                key=lambda m: (
+                    m.metadata.get("indexed_at") or "",
+                    -m.metadata.get("efficiency_score", 1.0)
+                )
+            )
+        else:
+            kept = islice(candidates, top_k)
         
-        return results[:top_k]
+        return [self._match_to_result(match) for match in kept]
+
+    @staticmethod
+    def _match_to_result(match) -> Dict:
+        """Flatten a steps-index query match into the dict find_similar_steps returns."""
+        get = match.metadata.get
+        return {
+            "id": match.id,
+            "score": match.score,
+            # OLD format fields (for legacy workflows)
+            "action_type": get("action_type"),
+            "goal_description": get("goal_description"),
+            "step_details": get("step_details"),
+            "workflow_name": get("workflow_name"),
+            "efficiency_score": get("efficiency_score", 1.0),
+            "indexed_at": get("indexed_at"),
+            "step_group_id": get("step_group_id"),
+            # OLD TEXT format fields (legacy human-readable)
+            "actions_performed": get("actions_performed"),
+            "system_logs": get("system_logs"),
+            # NEW JSON format fields (json_v2)
+            "urls_visited": get("urls_visited"),
+            "actions": get("actions"),
+            "steps": get("steps"),
+            "user_prompts": get("user_prompts"),
+            "format": get("format"),  # "json_v2" for new format
+        }
 
     def get_step_by_id(self, step_id: str) -> Optional[Dict]:
         """
@@ -630,35 +731,36 @@ class PineconeService:
                 groups[group_id] = []
             groups[group_id].append(match)
         
-        # From each group, pick the most recent with best efficiency
-        best_per_group = []
-        for group_id, group_matches in groups.items():
-            # Sort by efficiency (lower is better), then by date (recent first)
-            group_matches.sort(key=lambda x: (
-                x.get("efficiency_score", 1.0),
-                -datetime.fromisoformat(x.get("indexed_at", "2000-01-01")).timestamp()
+        # From each group, pick the best efficiency (lower is better), then the
+        # most recent. indexed_at is an ISO-8601 string, so string order is
+        # date order and no datetime parsing is needed.
+        best_per_group = [
+            max(group_matches, key=lambda x: (
+                -x.get("efficiency_score", 1.0),
+                x.get("indexed_at") or ""
             ))
-            best_per_group.append(group_matches[0])
+            for group_matches in groups.values()
+        ]
         
         # Pick overall best (highest similarity, best efficiency)
-        best_per_group.sort(key=lambda x: (
+        return min(best_per_group, key=lambda x: (
             -x["score"],
             x.get("efficiency_score", 1.0)
         ))
-        
-        return best_per_group[0] if best_per_group else None
 
     def get_best_step_for_goal_tiered(
         self,
         query_embedding: List[float],
         keywords: List[str] = None,
         thresholds: List[float] = None,
-        namespace: str = ""
+        namespace: str = "",
+        matches: Optional[List[Dict]] = None
     ) -> Optional[Dict]:
         """
         Find the best step using TIERED thresholds and keyword fallback.
         
         This is smarter than get_best_step_for_goal because it:
+        0. Returns straight away when a match reaches MATCH_HIGH_CONFIDENCE
         1. Tries multiple thresholds (high → low)
         2. Falls back to keyword matching if semantic search fails
         3. Returns the best available match rather than nothing
@@ -670,6 +772,7 @@ class PineconeService:
             keywords: Optional list of keywords for fallback matching
             thresholds: List of thresholds to try (default: [0.35, 0.25, 0.15])
             namespace: Namespace to search in
+            matches: Precomputed find_similar_steps results (skips the query)
         
         Returns:
             Best matching step or None
@@ -679,12 +782,23 @@ class PineconeService:
             thresholds = [0.35, 0.25, 0.15]
         
         # Get all matches first
-        matches = self.find_similar_steps(query_embedding, top_k=20, namespace=namespace)
+        if matches is None:
+            # Tiers select by score, so the top 20 by score need no overfetch
+            matches = self.find_similar_steps(
+                query_embedding, top_k=20, namespace=namespace, overfetch_factor=1
+            )
         
         if not matches:
-            print("   No matches found in steps index")
+            logger.debug("tiered_no_matches")
             return None
         
+        # High-confidence matches skip the tiers and the keyword fallback
+        confident = [m for m in matches if m["score"] >= MATCH_HIGH_CONFIDENCE]
+        if confident:
+            best = self._select_best_match(confident)
+            logger.debug("tiered_high_confidence_match", score=best["score"])
+            return best
+        
         # Try each threshold tier
         for threshold in thresholds:
             good_matches = [m for m in matches if m["score"] >= threshold]
@@ -692,25 +806,28 @@ class PineconeService:
             if good_matches:
                 # Found matches at this tier
                 best = self._select_best_match(good_matches)
-                print(f"   Found match at threshold {threshold}: score={best['score']:.3f}")
+                logger.debug("tiered_match_found", threshold=threshold, score=best["score"])
                 return best
-            else:
-                print(f"   No matches at threshold {threshold}, trying lower...")
+            logger.debug("tiered_threshold_missed", threshold=threshold)
         
         # Keyword fallback: if we have keywords, try to match them
         # Only if semantic score is at least 0.12 (not completely irrelevant)
         if keywords and len(keywords) > 0:
-            print(f"   Trying keyword fallback with: {keywords}")
+            logger.debug("tiered_keyword_fallback", keywords=keywords)
             keyword_matches = self._keyword_match(matches, keywords)
             keyword_matches = [m for m in keyword_matches if m.get("score", 0) >= 0.12]
             if keyword_matches:
                 best = self._select_best_match(keyword_matches)
-                print(f"   Keyword fallback matched: {best.get('goal_description', 'N/A')} (score: {best['score']:.3f})")
+                logger.debug(
+                    "tiered_keyword_match_found",
+                    goal_description=best.get("goal_description"),
+                    score=best["score"]
+                )
                 return best
         
         # REMOVED: No more "last resort" with score > 0.10
         # Anything below 0.15 is likely irrelevant
-        print("   No match passed minimum thresholds. Agent will work without workflow guidance.")
+        logger.debug("tiered_no_match_above_thresholds")
         return None
     
     def _select_best_match(self, matches: List[Dict]) -> Dict:
@@ -718,26 +835,17 @@ class PineconeService:
         if not matches:
             return None
         
-        # Group by step_group_id and pick best from each group
-        groups: Dict[str, List[Dict]] = {}
+        # Best per step_group_id, then best overall, is the overall best by
+        # (score desc, efficiency asc); exact ties go to the group seen first
+        group_order: Dict[str, int] = {}
         for match in matches:
-            group_id = match.get("step_group_id", match["id"])
-            if group_id not in groups:
-                groups[group_id] = []
-            groups[group_id].append(match)
-        
-        # From each group, pick best
-        best_per_group = []
-        for group_matches in groups.values():
-            group_matches.sort(key=lambda x: (
-                -x["score"],
-                x.get("efficiency_score", 1.0)
-            ))
-            best_per_group.append(group_matches[0])
+            group_order.setdefault(match.get("step_group_id", match["id"]), len(group_order))
         
-        # Pick overall best
-        best_per_group.sort(key=lambda x: (-x["score"], x.get("efficiency_score", 1.0)))
-        return best_per_group[0]
+        return min(matches, key=lambda x: (
+            -x["score"],
+            x.get("efficiency_score", 1.0),
+            group_order[x.get("step_group_id", x["id"])]
+        ))
     
     def _keyword_match(
         self, 
@@ -760,12 +868,12 @@ class PineconeService:
         keywords_lower = [k.lower() for k in keywords]
         
         for match in matches:
-            goal_desc = match.get("goal_description", "").lower()
-            workflow_name = match.get("workflow_name", "").lower()
-            combined = f"{goal_desc} {workflow_name}"
+            # find_similar_steps reports missing fields as None, not absent
+            combined = f"{match.get('goal_description') or ''} {match.get('workflow_name') or ''}".lower()
             
-            # Count keyword matches
-            matched_count = sum(1 for kw in keywords_lower if kw in combined)
+            # Count keyword matches; map over the bound __contains__ keeps
+            # the per-keyword loop in C
+            matched_count = sum(map(combined.__contains__, keywords_lower))
             
             if matched_count >= min_keyword_matches:
                 # Add keyword match score to help with ranking
@@ -846,11 +954,11 @@ class PineconeService:
                     "step_group_id": metadata.get("step_group_id"),
                 })
             
-            print(f"[HYBRID] Found {len(formatted_results)} results (alpha={alpha})")
+            logger.debug("steps_hybrid_search_results", count=len(formatted_results), alpha=alpha)
             return formatted_results
             
         except Exception as e:
-            print(f"[HYBRID] Search failed, falling back to dense-only: {e}")
+            logger.warning("steps_hybrid_search_failed", error=str(e), fallback="dense")
             # Fallback to regular dense search
             from screenshot_embedder import get_embedder
             embedder = get_embedder()
@@ -888,17 +996,15 @@ class PineconeService:
         Returns:
             The vector ID that was created
         """
-        import json
-        
-        # Generate unique ID
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        vector_id = f"success_{timestamp}_{workflow_id[:8]}"
+        # Generate unique ID (one clock read, shared with indexed_at)
+        now = datetime.now()
+        vector_id = f"success_{now.strftime('%Y%m%d%H%M%S')}_{workflow_id[:8]}"
         
         # Extract step IDs for reference
         step_ids = [str(step.get("step_number", i)) for i, step in enumerate(steps)]
         
         # Serialize steps
-        steps_json = json.dumps(steps, ensure_ascii=False, default=str)
+        steps_json = orjson.dumps(steps, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
         
         metadata = {
             "goal_text": goal_text[:500],  # Truncate for Pinecone limits
@@ -911,7 +1017,7 @@ class PineconeService:
             "company_context": company_context,
             "session_id": session_id,
             "execution_time_ms": execution_time_ms,
-            "indexed_at": datetime.now().isoformat(),
+            "indexed_at": now.isoformat(),
             "is_success": True,
         }
         
@@ -1090,13 +1196,13 @@ class PineconeService:
         
         # Generate unique ID from content hash + timestamp
         content_hash = hashlib.md5(sanitized_data.encode()).hexdigest()[:16]
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        vector_id = f"static_{content_hash}_{timestamp}"
+        now = datetime.now()
+        vector_id = f"static_{content_hash}_{now.strftime('%Y%m%d%H%M%S')}"
         
         # Build metadata
         metadata = {
             "data": sanitized_data,
-            "indexed_at": datetime.now().isoformat(),
+            "indexed_at": now.isoformat(),
             "data_type": "static",
             "char_count": len(sanitized_data),
         }
@@ -1175,11 +1281,16 @@ class PineconeService:
         return index.describe_index_stats()
 
     def get_all_stats(self) -> Dict[str, Dict]:
-        """Get stats for all indexes."""
+        """Get stats for all indexes (fetched in parallel, one request each)."""
+        futures = {
+            index_type.value: self._executor.submit(self.get_index_stats, index_type)
+            for index_type in IndexType
+        }
+        
         stats = {}
-        for index_type in IndexType:
+        for name, future in futures.items():
             try:
-                stats[index_type.value] = self.get_index_stats(index_type)
+                stats[name] = future.result()
             except Exception as e:
-                stats[index_type.value] = {"error": str(e)}
+                stats[name] = {"error": str(e)}
         return stats
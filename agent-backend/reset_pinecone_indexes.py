@@ -37,7 +37,7 @@ def reset_indexes():
             print(f"[SKIP] {index_name} does not exist")
     
     print("\n" + "="*60)
-    print("DONE. Restart your backend (python main.py) to recreate")
+    print("DONE. Restart your backend (python server.py) to recreate")
     print(f"indexes with correct {MRL_DIMENSION} dimensions for Gemini embeddings.")
     print("="*60)
     return True
@@ -142,6 +142,44 @@ class ScreenshotEmbedder:
         
         return normalized
     
+    def embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """
+        Generate query embeddings for several texts in one API call.
+        
+        COST OPTIMIZATION: Cached texts are served from cache; only the misses
+        are sent, batched into a single embed_content request.
+        
+        Args:
+            query_texts: Natural language queries to embed
+        
+        Returns:
+            List of 768-dimensional embedding vectors (normalized), in input order
+        """
+        cache = get_embedding_cache()
+        embeddings: List[Optional[List[float]]] = [
+            cache.get(text, context="query") for text in query_texts
+        ]
+        missing = [i for i, embedding in enumerate(embeddings) if not embedding]
+        if not missing:
+            return embeddings
+        
+        result = self.client.models.embed_content(
+            model=self.MODEL_NAME,
+            contents=[query_texts[i] for i in missing],
+            config=types.EmbedContentConfig(
+                task_type=self.TASK_TYPE_QUERY,
+                output_dimensionality=self.DIMENSION
+            )
+        )
+        
+        for i, embedding in zip(missing, result.embeddings):
+            normalized = self._normalize_embedding(embedding.values)
+            cache.set(query_texts[i], normalized, context="query")
+            embeddings[i] = normalized
+        print(f"[CACHE] Batch embedded {len(missing)}/{len(query_texts)} queries")
+        
+        return embeddings
+    
 
 
 
@@ -27,7 +27,7 @@ import asyncio
 import uuid
 import time
 from datetime import datetime
-from typing import Optional, Callable, Awaitable, List, Dict, Any, Union
+from typing import Optional, Callable, Awaitable, AsyncIterator, List, Dict, Any, Union
 import structlog
 
 from models import (
@@ -115,6 +115,7 @@ class SemanticQAAgent:
         # State
         self.current_execution_id: Optional[str] = None
         self.current_test_plan: Optional[TestPlan] = None
+        self.last_execution_result: Optional[TestPlanExecutionResult] = None
         self._stop_requested = False
         self._is_running = False
 
@@ -137,12 +138,44 @@ class SemanticQAAgent:
         Returns:
             TestPlanExecutionResult with complete execution details
         """
+        async for _ in self.execute_test_plan_iter(
+            test_plan,
+            start_from_step=start_from_step,
+            stop_on_failure=stop_on_failure,
+            max_retries_per_step=max_retries_per_step,
+        ):
+            pass
+        return self.last_execution_result
+
+    async def execute_test_plan_iter(
+        self,
+        test_plan: Union[TestPlan, Dict, str],
+        start_from_step: int = 1,
+        stop_on_failure: bool = True,
+        max_retries_per_step: int = 3,
+    ) -> AsyncIterator[StepExecutionResult]:
+        """
+        Execute a test plan, yielding each step result as soon as it is known.
+
+        Once the iterator is exhausted, the complete TestPlanExecutionResult
+        is available as self.last_execution_result.
+
+        Args:
+            test_plan: TestPlan object, JSON dict, or path to JSON file
+            start_from_step: Start execution from this step (for resume)
+            stop_on_failure: Stop execution on first failure
+            max_retries_per_step: Maximum retries for each step
+
+        Yields:
+            StepExecutionResult for every step, in plan order
+        """
         # Parse test plan if needed
         if isinstance(test_plan, (dict, str)):
             test_plan = self.parser.parse(test_plan)
 
         self.current_test_plan = test_plan
         self.current_execution_id = str(uuid.uuid4())
+        self.last_execution_result = None
         self._stop_requested = False
         self._is_running = True
 
@@ -180,15 +213,17 @@ class SemanticQAAgent:
         for step in test_plan.steps:
             # Skip steps before start_from_step
             if step.step_id < start_from_step:
-                steps_results.append(StepExecutionResult(
+                skipped = StepExecutionResult.model_construct(
                     step_id=step.step_id,
-                    status=StepStatus.SKIPPED,
+                    status=StepStatus.SKIPPED.value,
                     action=step.action,
                     target_description=step.target_description,
                     expected_visual=step.expected_visual,
                     timestamp=datetime.utcnow().isoformat()
-                ))
+                )
+                steps_results.append(skipped)
                 steps_status[step.step_id] = StepStatus.SKIPPED
+                yield skipped
                 continue
 
             # Check for stop request
@@ -197,15 +232,17 @@ class SemanticQAAgent:
                 # Mark remaining steps as skipped
                 for remaining_step in test_plan.steps:
                     if remaining_step.step_id >= step.step_id:
-                        steps_results.append(StepExecutionResult(
+                        skipped = StepExecutionResult.model_construct(
                             step_id=remaining_step.step_id,
-                            status=StepStatus.SKIPPED,
+                            status=StepStatus.SKIPPED.value,
                             action=remaining_step.action,
                             target_description=remaining_step.target_description,
                             expected_visual=remaining_step.expected_visual,
                             timestamp=datetime.utcnow().isoformat()
-                        ))
+                        )
+                        steps_results.append(skipped)
                         steps_status[remaining_step.step_id] = StepStatus.SKIPPED
+                        yield skipped
                 break
 
             # Notify execution status
@@ -237,6 +274,8 @@ class SemanticQAAgent:
                 except Exception as e:
                     logger.warning("screenshot_send_failed", error=str(e), step_id=step.step_id)
 
+            yield result
+
             # Check for failure
             if result.status == StepStatus.FAIL:
                 overall_status = StepStatus.FAIL
@@ -251,15 +290,17 @@ class SemanticQAAgent:
                     # Mark remaining steps as skipped
                     for remaining_step in test_plan.steps:
                         if remaining_step.step_id > step.step_id:
-                            steps_results.append(StepExecutionResult(
+                            skipped = StepExecutionResult.model_construct(
                                 step_id=remaining_step.step_id,
-                                status=StepStatus.SKIPPED,
+                                status=StepStatus.SKIPPED.value,
                                 action=remaining_step.action,
                                 target_description=remaining_step.target_description,
                                 expected_visual=remaining_step.expected_visual,
                                 timestamp=datetime.utcnow().isoformat()
-                            ))
+                            )
+                            steps_results.append(skipped)
                             steps_status[remaining_step.step_id] = StepStatus.SKIPPED
+                            yield skipped
                     break
 
         # Calculate summary
@@ -280,10 +321,10 @@ class SemanticQAAgent:
 
         self._is_running = False
 
-        result = TestPlanExecutionResult(
+        result = TestPlanExecutionResult.model_construct(
             test_case_id=test_plan.test_case_id,
             description=test_plan.description,
-            overall_status=overall_status,
+            overall_status=overall_status.value,
             steps_results=steps_results,
             total_steps=len(test_plan.steps),
             passed_steps=passed_steps,
@@ -304,7 +345,7 @@ class SemanticQAAgent:
             total_time_ms=total_execution_time
         )
 
-        return result
+        self.last_execution_result = result
 
     async def execute_single_step(
         self,
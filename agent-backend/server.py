@@ -0,0 +1,32 @@
+"""Backend entry point: python server.py
+
+Kept separate from main.py on purpose. The hammer index worker processes are
+spawned, and a spawned child re-imports the parent's __main__ module; with
+this thin launcher as __main__ they import only this file and hammer_indexer,
+not the whole FastAPI app (Pinecone client, agents, tokenizer downloads).
+"""
+import sys
+
+import uvicorn
+
+
+def run():
+    """Serve main:app with the production uvicorn settings."""
+    # uvloop and httptools give faster event-loop and HTTP/WebSocket framing;
+    # uvloop is unavailable on Windows, so fall back to the stdlib loop there.
+    # Terminate TLS at the reverse proxy in front of this process.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        ws="websockets",
+        # Frames are mostly base64 PNGs that barely compress; permessage-deflate
+        # would only add per-connection memory and CPU per screenshot.
+        ws_per_message_deflate=False,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,113 @@
+"""
+Test file for Cache Service embedding and in-memory match caching.
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agent-backend'))
+
+from cache_service import EmbeddingCache, MatchCache, get_match_cache
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache's in-memory tier."""
+
+    def test_set_then_get_served_from_memory(self, tmp_path):
+        """A freshly cached embedding is returned without touching disk."""
+        cache = EmbeddingCache(cache_dir=tmp_path)
+        cache.set("login page", [0.1, 0.2])
+        for cache_file in tmp_path.glob("*.json"):
+            cache_file.unlink()
+
+        assert cache.get("login page") == [0.1, 0.2]
+        assert cache.memory_hits == 1
+
+    def test_disk_hit_is_promoted_to_memory(self, tmp_path):
+        """Embeddings read from disk are kept in memory for the next lookup."""
+        EmbeddingCache(cache_dir=tmp_path).set("login page", [0.1, 0.2])
+        cache = EmbeddingCache(cache_dir=tmp_path)
+
+        assert cache.get("login page") == [0.1, 0.2]
+        assert cache.memory_hits == 0
+        assert cache.get("login page") == [0.1, 0.2]
+        assert cache.memory_hits == 1
+
+    def test_returned_list_is_a_copy(self, tmp_path):
+        """Mutating a returned embedding does not change the cached one."""
+        cache = EmbeddingCache(cache_dir=tmp_path)
+        cache.set("login page", [0.1, 0.2])
+        cache.get("login page").append(9.9)
+
+        assert cache.get("login page") == [0.1, 0.2]
+
+    def test_memory_evicts_least_recently_used(self, tmp_path):
+        """Past capacity, the least recently used embedding leaves memory."""
+        cache = EmbeddingCache(cache_dir=tmp_path, memory_capacity=2)
+        cache.set("a", [1.0])
+        cache.set("b", [2.0])
+        cache.get("a")
+        cache.set("c", [3.0])
+
+        assert cache.get_stats()["memory_cached_embeddings"] == 2
+        cache.get("a")
+        cache.get("b")  # falls back to disk
+        assert cache.memory_hits == 2
+
+
+class TestMatchCache:
+    """Test cases for MatchCache."""
+
+    def test_singleton(self):
+        """Test that get_match_cache returns singleton."""
+        assert get_match_cache() is get_match_cache()
+
+    def test_empty_cache_misses(self):
+        """Lookups on an empty cache return None."""
+        cache = MatchCache(dimension=3)
+
+        assert cache.get([1.0, 0.0, 0.0]) is None
+        assert cache.misses == 1
+
+    def test_near_duplicate_hits(self):
+        """A nearly identical embedding returns the cached match."""
+        cache = MatchCache(dimension=3, threshold=0.97)
+        match = {"id": "wf_login", "score": 0.9}
+        cache.put([1.0, 0.0, 0.0], match)
+
+        assert cache.get([0.99, 0.05, 0.0]) is match
+        assert cache.hits == 1
+
+    def test_dissimilar_embedding_misses(self):
+        """Embeddings below the threshold are not served from cache."""
+        cache = MatchCache(dimension=3, threshold=0.97)
+        cache.put([1.0, 0.0, 0.0], {"id": "wf_login"})
+
+        assert cache.get([0.0, 1.0, 0.0]) is None
+
+    def test_ring_buffer_evicts_oldest(self):
+        """Once full, new entries overwrite the oldest ones."""
+        cache = MatchCache(dimension=3, capacity=2)
+        cache.put([1.0, 0.0, 0.0], {"id": "a"})
+        cache.put([0.0, 1.0, 0.0], {"id": "b"})
+        cache.put([0.0, 0.0, 1.0], {"id": "c"})
+
+        assert cache.get([1.0, 0.0, 0.0]) is None
+        assert cache.get([0.0, 1.0, 0.0])["id"] == "b"
+        assert cache.get([0.0, 0.0, 1.0])["id"] == "c"
+
+    def test_clear(self):
+        """Clearing drops all cached matches."""
+        cache = MatchCache(dimension=3)
+        cache.put([1.0, 0.0, 0.0], {"id": "a"})
+        cache.clear()
+
+        assert cache.get([1.0, 0.0, 0.0]) is None
+
+    def test_zero_vector_is_ignored(self):
+        """Zero vectors are neither stored nor matched."""
+        cache = MatchCache(dimension=3)
+        cache.put([0.0, 0.0, 0.0], {"id": "a"})
+
+        assert cache.get([0.0, 0.0, 0.0]) is None
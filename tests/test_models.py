@@ -0,0 +1,123 @@
+"""
+Test file for SessionContext bookkeeping helpers.
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agent-backend'))
+
+from models import SessionContext, StepEvidence, StepExecutionResult, StepStatus, TestPlan, TestStep
+
+
+class TestSessionContext:
+    """Test cases for SessionContext."""
+
+    def test_record_task_bounds_history(self):
+        """Only the most recent MAX_TASK_HISTORY summaries are kept."""
+        context = SessionContext(session_id="s1")
+        total = SessionContext.MAX_TASK_HISTORY + 5
+        for i in range(total):
+            context.record_task({"goal": f"task {i}"})
+
+        assert len(context.task_history) == SessionContext.MAX_TASK_HISTORY
+        assert context.task_history[-1]["goal"] == f"task {total - 1}"
+        assert context.tasks_completed == total
+
+    def test_record_hammer_index(self):
+        """Hammer loads update the prompt notes and the typed record counts."""
+        context = SessionContext(session_id="s1")
+        context.record_hammer_index(120, company="Acme", filename="acme.xlsx")
+        context.record_hammer_index(30)
+
+        assert context.hammer_record_counts == [120, 30]
+        assert context.important_notes["hammer_records"] == "30"
+        assert context.important_notes["hammer_company"] == "Acme"
+        assert context.important_notes["hammer_file"] == "acme.xlsx"
+
+    def test_instances_do_not_share_lists(self):
+        """Each session starts with its own empty history."""
+        first = SessionContext(session_id="a")
+        first.record_task({"goal": "x"})
+
+        assert SessionContext(session_id="b").task_history == []
+
+    def test_created_at_formatted_from_ns(self):
+        """created_at is derived from created_at_ns and included in dumps."""
+        context = SessionContext(session_id="s1", created_at_ns=0)
+
+        assert context.model_dump()["created_at"] == context.created_at
+        assert context.created_at.startswith("1970-01-01") or context.created_at.startswith("1969-12-31")
+
+    def test_remember_value_bounds_history(self):
+        """The clipboard tracks the latest value; history keeps the newest MAX_SESSION_VALUES."""
+        context = SessionContext(session_id="s1")
+        total = SessionContext.MAX_SESSION_VALUES + 3
+        for i in range(total):
+            context.remember_value(f"US{i}")
+
+        assert context.clipboard == f"US{total - 1}"
+        assert len(context.last_copied_values) == SessionContext.MAX_SESSION_VALUES
+        assert context.last_copied_values[0] == "US3"
+
+
+class TestStepExecutionResult:
+    """Test cases for StepExecutionResult."""
+
+    def test_model_construct_matches_validated(self):
+        """Results built without validation serialize like validated ones."""
+        fields = dict(
+            step_id=2,
+            # model_construct skips use_enum_values, so callers pass the value
+            status=StepStatus.PASS.value,
+            action="click",
+            target_description="Login button",
+            expected_visual="Dashboard is visible",
+            evidence=StepEvidence(screenshot_after="after.png", visual_match_confidence=0.9),
+            retry_count=1,
+            execution_time_ms=1200,
+            timestamp="2024-01-01T00:00:00",
+        )
+
+        constructed = StepExecutionResult.model_construct(**fields)
+        validated = StepExecutionResult(**fields)
+
+        assert type(constructed.status) is str
+        assert type(validated.status) is str
+        assert constructed.model_dump() == validated.model_dump()
+        assert constructed.model_dump_json() == validated.model_dump_json()
+
+
+class TestTestPlan:
+    """Test cases for TestPlan."""
+
+    def _plan(self, *step_ids):
+        return TestPlan(
+            test_case_id="TC-1",
+            description="Sample",
+            steps=[TestStep(step_id=i, action="verify", expected_visual=f"step {i}") for i in step_ids],
+        )
+
+    def test_get_step(self):
+        """Steps are found by ID; unknown IDs return None."""
+        plan = self._plan(1, 2, 3)
+
+        assert plan.get_step(2).expected_visual == "step 2"
+        assert plan.get_step(4) is None
+
+    def test_get_step_after_steps_replaced(self):
+        """Replacing the steps list rebuilds the lookup index."""
+        plan = self._plan(1, 2)
+        plan.get_step(1)
+        plan.steps = self._plan(5).steps
+
+        assert plan.get_step(1) is None
+        assert plan.get_step(5).expected_visual == "step 5"
+
+    def test_index_does_not_affect_equality(self):
+        """The cached index is not part of the model's data."""
+        plan = self._plan(1, 2)
+        plan.get_step(1)
+
+        assert plan == self._plan(1, 2)
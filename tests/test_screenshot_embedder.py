@@ -90,6 +90,22 @@ class TestScreenshotEmbedder:
         assert len(embedding) == 768
         mock_genai_client.models.embed_content.assert_called_once()
     
+    def test_embed_queries_single_call(self, embedder, mock_genai_client):
+        """Test that uncached queries are embedded in one batched call."""
+        mock_embedding = MagicMock()
+        mock_embedding.values = [0.1] * 768
+        mock_genai_client.models.embed_content.return_value.embeddings = [mock_embedding, mock_embedding]
+        
+        cache = MagicMock()
+        cache.get.side_effect = [None, [0.2] * 768, None]
+        with patch("screenshot_embedder.get_embedding_cache", return_value=cache):
+            embeddings = embedder.embed_queries(["login", "open settings", "logout"])
+        
+        assert len(embeddings) == 3
+        assert embeddings[1] == [0.2] * 768
+        mock_genai_client.models.embed_content.assert_called_once()
+        assert mock_genai_client.models.embed_content.call_args.kwargs["contents"] == ["login", "logout"]
+    
     def test_embed_batch(self, embedder, sample_image_path, mock_genai_client):
         """Test batch embedding of multiple images."""
         paths = [sample_image_path, sample_image_path]